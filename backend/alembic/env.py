@@ -7,8 +7,8 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
 # Import your models and Base
-from app.models import Base
-from app.database import get_db
+from app.core.database import Base
+from app.models import models
 import os
 from dotenv import load_dotenv
 
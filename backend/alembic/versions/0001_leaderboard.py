@@ -0,0 +1,154 @@
+"""leaderboard table
+
+Revision ID: 0001_leaderboard
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_leaderboard'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+players = sa.table(
+    'players',
+    sa.column('id', sa.Integer),
+    sa.column('name', sa.String),
+)
+
+player_stats = sa.table(
+    'player_stats',
+    sa.column('player_id', sa.Integer),
+    sa.column('match_type', sa.String),
+    sa.column('season', sa.Integer),
+    sa.column('wins', sa.Integer),
+    sa.column('losses', sa.Integer),
+    sa.column('otl', sa.Integer),
+    sa.column('scored', sa.Integer),
+    sa.column('conceded', sa.Integer),
+)
+
+leaderboard = sa.table(
+    'leaderboard',
+    sa.column('match_type', sa.String),
+    sa.column('season', sa.Integer),
+    sa.column('player_id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('position', sa.Integer),
+    sa.column('played', sa.Integer),
+    sa.column('wins', sa.Integer),
+    sa.column('losses', sa.Integer),
+    sa.column('otl', sa.Integer),
+    sa.column('points', sa.Integer),
+    sa.column('winrate', sa.Float),
+    sa.column('avg_points', sa.Float),
+    sa.column('efficiency', sa.Float),
+    sa.column('mmr', sa.Float),
+)
+
+
+def ratio(numerator, denominator):
+    return sa.case((denominator == 0, 0.0), else_=sa.cast(numerator, sa.Float) / denominator)
+
+
+def ranked_stats():
+    # Frozen copy of app.utils.leaderboard.ranked_stats_query at this revision
+    played = player_stats.c.wins + player_stats.c.losses + player_stats.c.otl
+    points = player_stats.c.wins * 2 + player_stats.c.otl
+
+    stats = (
+        sa.select(
+            player_stats.c.match_type,
+            player_stats.c.season,
+            player_stats.c.player_id,
+            players.c.name,
+            played.label('played'),
+            player_stats.c.wins,
+            player_stats.c.losses,
+            player_stats.c.otl,
+            points.label('points'),
+            ratio(player_stats.c.wins, played).label('winrate'),
+            ratio(points, played).label('avg_points'),
+            ratio(player_stats.c.scored, player_stats.c.conceded).label('efficiency'),
+        )
+        .join(players, players.c.id == player_stats.c.player_id)
+        .subquery()
+    )
+
+    # Names tie-break in code point order, as the app ranks them
+    name_order = stats.c.name
+    if op.get_bind().dialect.name == 'postgresql':
+        name_order = name_order.collate('C')
+
+    return sa.select(
+        stats.c.match_type,
+        stats.c.season,
+        stats.c.player_id,
+        stats.c.name,
+        sa.func.row_number().over(
+            partition_by=(stats.c.match_type, stats.c.season),
+            order_by=(stats.c.points.desc(), name_order)
+        ),
+        stats.c.played,
+        stats.c.wins,
+        stats.c.losses,
+        stats.c.otl,
+        stats.c.points,
+        stats.c.winrate,
+        stats.c.avg_points,
+        stats.c.efficiency,
+        stats.c.avg_points * stats.c.efficiency,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all may have made it already
+    op.create_table(
+        'leaderboard',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('match_type', sa.String(), nullable=False),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('played', sa.Integer(), nullable=True),
+        sa.Column('wins', sa.Integer(), nullable=True),
+        sa.Column('losses', sa.Integer(), nullable=True),
+        sa.Column('otl', sa.Integer(), nullable=True),
+        sa.Column('points', sa.Integer(), nullable=True),
+        sa.Column('winrate', sa.Float(), nullable=True),
+        sa.Column('avg_points', sa.Float(), nullable=True),
+        sa.Column('efficiency', sa.Float(), nullable=True),
+        sa.Column('mmr', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['player_id'], ['players.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('match_type', 'season', 'player_id', name='unique_leaderboard_player'),
+        if_not_exists=True
+    )
+    op.create_index(
+        'ix_leaderboard_position', 'leaderboard',
+        ['match_type', 'season', 'position'], if_not_exists=True
+    )
+
+    # Backfill from player_stats, replacing whatever create_all's app wrote
+    op.execute(leaderboard.delete())
+    op.execute(
+        leaderboard.insert().from_select(
+            [column.name for column in leaderboard.columns], ranked_stats()
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leaderboard_position', table_name='leaderboard', if_exists=True)
+    op.drop_table('leaderboard', if_exists=True)
@@ -0,0 +1,50 @@
+"""match and match_players indexes
+
+Revision ID: 0002_match_indexes
+Revises: 0001_leaderboard
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_match_indexes'
+down_revision: Union[str, Sequence[str], None] = '0001_leaderboard'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tables may already carry these when they were created by create_all
+    op.create_index('ix_matches_created_at_id', 'matches', ['created_at', 'id'], if_not_exists=True)
+    op.create_index(
+        'ix_matches_type_season_created_at', 'matches',
+        ['match_type', 'season', 'created_at', 'id'], if_not_exists=True
+    )
+    op.create_index(
+        'ix_matches_drafts', 'matches', ['created_at', 'id'],
+        postgresql_where=sa.text('blue_score IS NULL'),
+        sqlite_where=sa.text('blue_score IS NULL'),
+        if_not_exists=True
+    )
+    op.create_index('ix_match_players_match_id', 'match_players', ['match_id'], if_not_exists=True)
+    op.create_index(
+        'ix_match_players_player_id_match_id', 'match_players',
+        ['player_id', 'match_id'], if_not_exists=True
+    )
+    op.create_index('ix_player_stats_type_season', 'player_stats', ['match_type', 'season'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_player_stats_type_season', table_name='player_stats', if_exists=True)
+    op.drop_index('ix_match_players_player_id_match_id', table_name='match_players', if_exists=True)
+    op.drop_index('ix_match_players_match_id', table_name='match_players', if_exists=True)
+    op.drop_index('ix_matches_drafts', table_name='matches', if_exists=True)
+    op.drop_index('ix_matches_type_season_created_at', table_name='matches', if_exists=True)
+    op.drop_index('ix_matches_created_at_id', table_name='matches', if_exists=True)
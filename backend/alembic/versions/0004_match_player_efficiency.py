@@ -0,0 +1,106 @@
+"""snapshot efficiency on match_players
+
+Revision ID: 0004_match_player_efficiency
+Revises: 0003_data_versions
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from collections import defaultdict
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_match_player_efficiency'
+down_revision: Union[str, Sequence[str], None] = '0003_data_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+matches = sa.table(
+    'matches',
+    sa.column('id'),
+    sa.column('match_type', sa.String),
+    sa.column('season', sa.Integer),
+    sa.column('blue_score', sa.Integer),
+    sa.column('red_score', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+)
+
+match_players = sa.table(
+    'match_players',
+    sa.column('id', sa.Integer),
+    sa.column('match_id'),
+    sa.column('player_id', sa.Integer),
+    sa.column('color', sa.String),
+    sa.column('efficiency', sa.Float),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all may have made it already
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('match_players')}
+    if 'efficiency' not in columns:
+        op.add_column('match_players', sa.Column('efficiency', sa.Float(), nullable=True))
+
+    # Backfill by replaying history: a player's efficiency at kickoff is
+    # scored / conceded over the completed matches of that match type and
+    # season created before this one.
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(
+            match_players.c.id,
+            match_players.c.player_id,
+            match_players.c.color,
+            matches.c.id,
+            matches.c.match_type,
+            matches.c.season,
+            matches.c.blue_score,
+            matches.c.red_score,
+        )
+        .join(matches, matches.c.id == match_players.c.match_id)
+        .order_by(matches.c.created_at, matches.c.id)
+    )
+
+    totals = defaultdict(lambda: [0, 0])
+    pending = []
+    updates = []
+
+    def close_match():
+        # Results only count from the next match on
+        for player_key, scored, conceded in pending:
+            totals[player_key][0] += scored
+            totals[player_key][1] += conceded
+        pending.clear()
+
+    current_match = None
+    for mp_id, player_id, color, match_id, match_type, season, blue_score, red_score in rows:
+        if match_id != current_match:
+            close_match()
+            current_match = match_id
+
+        player_key = (player_id, match_type, season)
+        scored, conceded = totals[player_key]
+        updates.append({"mp_id": mp_id, "efficiency": scored / conceded if conceded else 0.0})
+
+        if blue_score is not None and red_score is not None:
+            if color == "blue":
+                pending.append((player_key, blue_score, red_score))
+            else:
+                pending.append((player_key, red_score, blue_score))
+
+    statement = (
+        sa.update(match_players)
+        .where(match_players.c.id == sa.bindparam("mp_id"))
+        .values(efficiency=sa.bindparam("efficiency"))
+    )
+    for start in range(0, len(updates), 5000):
+        bind.execute(statement, updates[start:start + 5000])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('match_players', 'efficiency')
@@ -0,0 +1,157 @@
+"""player ratings and rating snapshots on match_players
+
+Revision ID: 0005_player_ratings
+Revises: 0004_match_player_efficiency
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from collections import defaultdict
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_player_ratings'
+down_revision: Union[str, Sequence[str], None] = '0004_match_player_efficiency'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+matches = sa.table(
+    'matches',
+    sa.column('id'),
+    sa.column('match_type', sa.String),
+    sa.column('blue_score', sa.Integer),
+    sa.column('red_score', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+)
+
+match_players = sa.table(
+    'match_players',
+    sa.column('id', sa.Integer),
+    sa.column('match_id'),
+    sa.column('player_id', sa.Integer),
+    sa.column('color', sa.String),
+    sa.column('rating', sa.Float),
+)
+
+player_ratings = sa.table(
+    'player_ratings',
+    sa.column('player_id', sa.Integer),
+    sa.column('match_type', sa.String),
+    sa.column('rating', sa.Float),
+    sa.column('matches', sa.Integer),
+)
+
+# Frozen copy of the rules in app/utils/ratings.py at this revision
+INITIAL_RATING = 1500.0
+RATING_SCALE = 400.0
+K_FACTOR = 24.0
+PROVISIONAL_MATCHES = 10
+PROVISIONAL_K_FACTOR = 2 * K_FACTOR
+
+
+def rate_match(ratings, rows, blue_won):
+    # rows are (player key, is blue), ratings maps a key to [rating, matches]
+    blue = [ratings[key][0] for key, is_blue in rows if is_blue]
+    red = [ratings[key][0] for key, is_blue in rows if not is_blue]
+    expected = 1 / (1 + 10 ** ((sum(red) / len(red) - sum(blue) / len(blue)) / RATING_SCALE))
+    surprise = (1.0 if blue_won else 0.0) - expected
+
+    for key, is_blue in rows:
+        rating = ratings[key]
+        k = PROVISIONAL_K_FACTOR if rating[1] < PROVISIONAL_MATCHES else K_FACTOR
+        rating[0] += k * surprise if is_blue else -k * surprise
+        rating[1] += 1
+
+
+def backfill_ratings(bind):
+    # Replay every completed match in played order. Each match player gets
+    # the rating they had going into the match, unless the app already took
+    # a snapshot, and player_ratings gets where everyone ended up.
+    rows = bind.execute(
+        sa.select(
+            matches.c.id,
+            matches.c.match_type,
+            matches.c.blue_score > matches.c.red_score,
+            match_players.c.id,
+            match_players.c.player_id,
+            match_players.c.color,
+            match_players.c.rating,
+        )
+        .join(matches, matches.c.id == match_players.c.match_id)
+        .filter(matches.c.blue_score != None, matches.c.red_score != None)
+        .order_by(matches.c.created_at, matches.c.id)
+    )
+
+    ratings = defaultdict(lambda: [INITIAL_RATING, 0])
+    snapshots = []
+    current_match, current_rows, current_won = None, [], False
+
+    for match_id, match_type, blue_won, mp_id, player_id, color, snapshot in rows:
+        if match_id != current_match:
+            if current_rows:
+                rate_match(ratings, current_rows, current_won)
+            current_match, current_rows, current_won = match_id, [], blue_won
+
+        key = (player_id, match_type)
+        current_rows.append((key, color == 'blue'))
+        if snapshot is None:
+            snapshots.append({'mp_id': mp_id, 'rating': ratings[key][0]})
+
+    if current_rows:
+        rate_match(ratings, current_rows, current_won)
+
+    statement = (
+        sa.update(match_players)
+        .where(match_players.c.id == sa.bindparam('mp_id'))
+        .values(rating=sa.bindparam('rating'))
+    )
+    for start in range(0, len(snapshots), 5000):
+        bind.execute(statement, snapshots[start:start + 5000])
+
+    # Replacing whatever create_all's app wrote
+    bind.execute(player_ratings.delete())
+    values = [
+        {'player_id': player_id, 'match_type': match_type, 'rating': rating, 'matches': played}
+        for (player_id, match_type), (rating, played) in ratings.items()
+    ]
+    for start in range(0, len(values), 5000):
+        bind.execute(player_ratings.insert(), values[start:start + 5000])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'player_ratings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('match_type', sa.String(), nullable=False),
+        sa.Column('rating', sa.Float(), nullable=False),
+        sa.Column('matches', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['player_id'], ['players.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('player_id', 'match_type', name='unique_player_rating'),
+        if_not_exists=True
+    )
+    op.create_index(
+        'ix_player_ratings_rating', 'player_ratings',
+        ['match_type', 'rating'], if_not_exists=True
+    )
+
+    # create_all may have made the column already
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('match_players')}
+    if 'rating' not in columns:
+        op.add_column('match_players', sa.Column('rating', sa.Float(), nullable=True))
+
+    # Drafts from before ratings keep a null snapshot and efficiency based odds
+    backfill_ratings(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('match_players', 'rating')
+    op.drop_index('ix_player_ratings_rating', table_name='player_ratings', if_exists=True)
+    op.drop_table('player_ratings', if_exists=True)
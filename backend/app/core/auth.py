@@ -1,17 +1,21 @@
 import os
 import uuid
-from typing import Optional
+from typing import Any, Dict, Optional
 from fastapi import APIRouter, Depends, Request
-from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin
+from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin, exceptions
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
     JWTStrategy,
 )
 from fastapi_users.db import SQLAlchemyUserDatabase
+from fastapi_users.jwt import decode_jwt
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+import jwt
 
 from app.models.models import User
+from app.core.cache import user_cache
 from app.core.database import get_async_session
 from app.core.config import settings
 
@@ -32,6 +36,19 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     async def on_after_request_verify(self, user: User, token: str, request: Optional[Request] = None):
         print(f"Verification requested for user {user.id}. Verification token: {token}")
 
+    # Anything that changes or removes a user drops its cached copy
+    async def on_after_update(self, user: User, update_dict: Dict[str, Any], request: Optional[Request] = None):
+        user_cache.invalidate(user.id)
+
+    async def on_after_verify(self, user: User, request: Optional[Request] = None):
+        user_cache.invalidate(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None):
+        user_cache.invalidate(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        user_cache.invalidate(user.id)
+
 
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
     yield SQLAlchemyUserDatabase(session, User)
@@ -43,11 +60,57 @@ async def get_user_manager(
     yield UserManager(user_db)
 
 
+def snapshot_user(user: User) -> Dict[str, Any]:
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+
+def restore_user(values: Dict[str, Any]) -> User:
+    # A fresh detached instance per request: it can join the request's session
+    # (the users router updates it in place) without touching the database
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
 # JWT Strategy
+class CachedJWTStrategy(JWTStrategy):
+    """
+    JWT strategy that still verifies every token but serves the user it
+    names from user_cache, skipping the lookup query while the entry lives.
+    """
+
+    async def read_token(self, token: Optional[str], user_manager: UserManager) -> Optional[User]:
+        if token is None:
+            return None
+
+        try:
+            data = decode_jwt(
+                token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
+            )
+            subject = data.get("sub")
+            if subject is None:
+                return None
+            user_id = user_manager.parse_id(subject)
+        except (jwt.PyJWTError, exceptions.InvalidID):
+            return None
+
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            return restore_user(cached)
+
+        try:
+            user = await user_manager.get(user_id)
+        except exceptions.UserNotExists:
+            return None
+
+        user_cache.set(user_id, snapshot_user(user))
+        return user
+
+
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=SECRET, lifetime_seconds=3600)
+    return CachedJWTStrategy(secret=SECRET, lifetime_seconds=3600)
 
 auth_backend = AuthenticationBackend(
     name="jwt",
@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+class ResponseCache:
+    """
+    Bounded LRU of endpoint responses. Every entry carries tags describing
+    what it was built from, writes invalidate by tag.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # Bumped on every invalidation so a read that raced a write is not stored
+        self.generation = 0
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Set[Hashable]]]" = OrderedDict()
+        self._tagged: Dict[Hashable, Set[Hashable]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable], generation: int):
+        if self.maxsize <= 0 or generation != self.generation:
+            return
+
+        self._discard(key)
+
+        tags = set(tags)
+        self._entries[key] = (value, tags)
+        for tag in tags:
+            self._tagged.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.maxsize:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate(self, *tags: Hashable):
+        self.generation += 1
+        for tag in tags:
+            for key in self._tagged.pop(tag, ()):
+                self._discard(key)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self._tagged.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _discard(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        for tag in entry[1]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+
+class TTLCache:
+    """
+    Bounded LRU whose entries also expire a fixed number of seconds after
+    they were stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+
+        self._entries.pop(key, None)
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+match_cache = ResponseCache(settings.match_cache_size)
+user_cache = TTLCache(settings.auth_cache_size, settings.auth_cache_ttl)
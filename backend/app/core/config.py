@@ -1,14 +1,59 @@
+from typing import Literal, Optional
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
+# One in-memory database shared by every session of the process
+TESTING_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
 class Settings(BaseSettings):
-    database_url: str
+    # Required, except in testing where it defaults to TESTING_DATABASE_URL
+    database_url: Optional[str] = None
     frontend_url: str
 
     secret_key: str
     registration_code: str
     environment: str = "development" # prod, testing, development
+
+    # Engine profile: direct, pgbouncer or test (see app.core.database).
+    # Unset picks direct in development, test in testing, pgbouncer otherwise.
+    # The pool values below override the profile's own when set.
+    db_profile: Optional[str] = None
+    db_pool_size: Optional[int] = None
+    db_max_overflow: Optional[int] = None
+    db_pool_timeout: Optional[float] = None
+    # Connections opened by the lifespan hook before serving
+    db_pool_warmup: Optional[int] = None
+
+    # What startup does with the schema: "create_all" creates missing tables,
+    # "check" only compares the Alembic revision and refuses to start on a
+    # mismatch (run `alembic upgrade head` first), "skip" does neither
+    db_startup: Literal["create_all", "check", "skip"] = "create_all"
+
+    # Entries kept by the in-process match response cache, 0 disables it.
+    # Entries are keyed on the matches data version, so writes made through
+    # other workers are never served stale.
+    match_cache_size: int = 512
+
+    # Authenticated users kept per process, keyed by token subject. Updates and
+    # deletes through this process invalidate immediately, other workers see
+    # them once the entry expires. Either value at 0 disables the cache.
+    auth_cache_size: int = 1024
+    auth_cache_ttl: float = 30
+
+    # Serve list_matches and list_players through orjson, skipping pydantic
+    fast_json: bool = False
     
+    @model_validator(mode="after")
+    def default_database_url(self):
+        if self.database_url is None:
+            if self.environment != "testing":
+                raise ValueError("database_url is required outside of testing")
+            self.database_url = TESTING_DATABASE_URL
+        return self
+
     class Config:
         env_file = ".env"
 
@@ -1,24 +1,148 @@
+import ast
+import asyncio
+import time
 from collections.abc import AsyncGenerator
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import event, exc, make_url, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 
 from app.core.config import settings
 
 
-if settings.environment == "development":
-    engine_args = {}
-else:
-    engine_args = {
-        "connect_args" : {
+# Engine profiles per deployment. "direct" talks to Postgres itself and keeps
+# asyncpg's prepared statement caches; "pgbouncer" sits behind a transaction
+# mode pooler, which cannot keep prepared statements across transactions, so
+# the caches are off and the pool stays small (pgbouncer does the real
+# pooling); "test" keeps a handful of connections and fails fast, or shares
+# a single one when the database is in-memory SQLite (see below).
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "direct": {
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_pre_ping": True,
+        "warmup": 5,
+    },
+    "pgbouncer": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 10,
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+        "connect_args": {
             "prepared_statement_cache_size": 0,
             "statement_cache_size": 0
         },
-        "pool_recycle": 300,
-        "pool_pre_ping": True
+        "warmup": 5,
+    },
+    "test": {
+        "pool_size": 5,
+        "max_overflow": 0,
+        "pool_timeout": 5,
+        "warmup": 0,
+    },
+}
+
+
+def resolve_profile() -> str:
+    if settings.db_profile is not None:
+        if settings.db_profile not in ENGINE_PROFILES:
+            raise ValueError(f"Unknown db_profile {settings.db_profile!r}")
+        return settings.db_profile
+    if settings.environment == "development":
+        return "direct"
+    if settings.environment == "testing":
+        return "test"
+    return "pgbouncer"
+
+
+class PoolStats:
+    """
+    Checkout telemetry of the engine pool: how many checkouts there were,
+    how long they waited for a connection, and how many gave up.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # Time spent in connect() is queueing for a free slot plus, on a miss,
+    # opening a new connection; both are what a request waits for
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record(time.perf_counter() - start)
+        return connection
+
+
+def engine_options(profile: str, database_url: str) -> Tuple[Dict[str, Any], int]:
+    """Engine arguments and pool warm-up size of a profile, with the DB_POOL_* overrides applied."""
+    options = {
+        key: value for key, value in ENGINE_PROFILES[profile].items() if key != "warmup"
     }
+    for key, value in (
+        ("pool_size", settings.db_pool_size),
+        ("max_overflow", settings.db_max_overflow),
+        ("pool_timeout", settings.db_pool_timeout),
+    ):
+        if value is not None:
+            options[key] = value
+    warmup = (
+        settings.db_pool_warmup if settings.db_pool_warmup is not None
+        else ENGINE_PROFILES[profile]["warmup"]
+    )
+
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # Each new connection would see its own empty database, so every session
+        # shares one connection instead of pooling
+        return {"poolclass": StaticPool}, 0
+
+    options["poolclass"] = TimedQueuePool
+    return options, warmup
+
+
+profile = resolve_profile()
+engine_args, pool_warmup = engine_options(profile, settings.database_url)
 
 engine = create_async_engine(settings.database_url, **engine_args)
 
+if engine_args.get("poolclass") is StaticPool:
+    # The sqlite driver begins transactions lazily on its own, which breaks
+    # SAVEPOINTs; let SQLAlchemy emit BEGIN so tests can nest a session's
+    # transaction inside one that is rolled back afterwards
+    @event.listens_for(engine.sync_engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 class Base(DeclarativeBase):
@@ -30,6 +154,84 @@ async def create_db_and_tables():
         await conn.run_sync(Base.metadata.create_all)
 
 
+def alembic_heads() -> Tuple[str, ...]:
+    # Read straight from the migration scripts, which ship with the code.
+    # Parsing them is much cheaper than importing alembic's ScriptDirectory.
+    revisions, parents = set(), set()
+    for script in (Path(__file__).resolve().parents[2] / "alembic" / "versions").glob("*.py"):
+        values = {}
+        for node in ast.parse(script.read_text()).body:
+            if isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                        values[target.id] = ast.literal_eval(node.value)
+
+        if "revision" not in values:
+            continue
+        revisions.add(values["revision"])
+        down = values.get("down_revision")
+        parents.update(down if isinstance(down, (tuple, list)) else [down] if down else [])
+
+    return tuple(sorted(revisions - parents))
+
+
+async def check_db_revision():
+    """Raise unless the database is stamped with the Alembic head revision(s)."""
+    expected = alembic_heads()
+    try:
+        async with engine.connect() as conn:
+            response = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            current = tuple(sorted(row[0] for row in response.all()))
+    except exc.DBAPIError:
+        current = ()
+
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {', '.join(current) or 'none'}, "
+            f"this code expects {', '.join(expected)}. Run `alembic upgrade head` "
+            f"(or `python manage.py init-db` on an empty database) before starting."
+        )
+
+
+async def warm_up_pool(connections: int = pool_warmup):
+    # Open the connections side by side and hand them back, so they sit idle
+    # in the pool instead of being set up by the first requests
+    connections = min(connections, engine_args.get("pool_size", 0))
+    if connections <= 0:
+        return
+
+    async with AsyncExitStack() as stack:
+        await asyncio.gather(*(
+            stack.enter_async_context(engine.connect()) for _ in range(connections)
+        ))
+
+
+def get_pool_status() -> Dict[str, Any]:
+    pool = engine.pool
+    if isinstance(pool, TimedQueuePool):
+        size, max_overflow = pool.size(), engine_args["max_overflow"]
+        checked_out, idle, overflow = pool.checkedout(), pool.checkedin(), pool.overflow()
+    else:
+        # The single shared in-memory connection
+        size, max_overflow, checked_out, idle, overflow = 1, 0, 0, 1, 0
+
+    capacity = size + max_overflow
+    return {
+        "profile": profile,
+        "size": size,
+        "max_overflow": max_overflow,
+        "checked_out": checked_out,
+        "idle": idle,
+        "overflow": overflow,
+        "saturation": checked_out / capacity if capacity else 0,
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "wait_avg_ms": pool_stats.wait_total / pool_stats.checkouts * 1000 if pool_stats.checkouts else 0,
+        "wait_max_ms": pool_stats.wait_max * 1000,
+    }
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
@@ -0,0 +1,170 @@
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, SummaryMetricFamily
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.database import get_pool_status, pool_stats
+
+
+# Own registry so only what is defined here is exported. Metrics are per
+# process: scrape every worker, or run a single one behind the scraper.
+registry = CollectorRegistry()
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request until its response body is sent",
+    ["method", "route"],
+    registry=registry,
+)
+REQUESTS = Counter(
+    "http_requests",
+    "Handled requests",
+    ["method", "route", "status"],
+    registry=registry,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled",
+    ["method"],
+    registry=registry,
+)
+
+SQL_LATENCY = Histogram(
+    "db_statement_duration_seconds",
+    "Time spent executing SQL statements",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    registry=registry,
+)
+SQL_ERRORS = Counter(
+    "db_statement_errors",
+    "SQL statements that raised",
+    ["operation"],
+    registry=registry,
+)
+
+STARTUP_SECONDS = Gauge(
+    "app_startup_duration_seconds",
+    "Time spent in each startup phase of this process",
+    ["phase"],
+    registry=registry,
+)
+
+SQL_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY")
+
+
+def sql_operation(statement: str) -> str:
+    # First keyword only, keeping label cardinality fixed
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in SQL_OPERATIONS else "OTHER"
+
+
+class PoolCollector:
+    """Engine pool state and checkout waits (see TimedQueuePool), read at scrape time."""
+
+    def collect(self):
+        status = get_pool_status()
+
+        for name, help_text in (
+            ("size", "Connections the pool keeps"),
+            ("checked_out", "Connections currently in use"),
+            ("idle", "Connections idle in the pool"),
+            ("overflow", "Connections opened past the pool size"),
+            ("saturation", "Checked out connections over pool size plus overflow"),
+        ):
+            yield GaugeMetricFamily(f"db_pool_{name}", help_text, value=status[name])
+
+        yield SummaryMetricFamily(
+            "db_pool_checkout_wait_seconds",
+            "Time spent waiting for a pooled connection",
+            count_value=pool_stats.checkouts,
+            sum_value=pool_stats.wait_total,
+        )
+        yield GaugeMetricFamily(
+            "db_pool_checkout_wait_max_seconds",
+            "Longest checkout wait since start",
+            value=pool_stats.wait_max,
+        )
+        yield CounterMetricFamily(
+            "db_pool_checkout_timeouts",
+            "Checkouts that gave up after pool_timeout",
+            value=pool_stats.timeouts,
+        )
+
+
+registry.register(PoolCollector())
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Time every statement run on the engine."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        SQL_LATENCY.labels(sql_operation(statement)).observe(time.perf_counter() - start)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        SQL_ERRORS.labels(sql_operation(context.statement or "")).inc()
+
+
+def route_template(scope) -> str:
+    # The router sets "route" once a path matched; unmatched paths share one
+    # label. Routers included with a prefix hand over their own route, whose
+    # path_format lacks that prefix: it is the part of the path in front of
+    # what the route's pattern matches.
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+
+    path = scope["path"]
+    for index, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[index:]):
+            return path[:index] + route.path_format
+    return route.path_format
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware, so streamed responses are timed until their last
+    chunk. Requests are labelled by route template, not by raw path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+
+            route = route_template(scope)
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            REQUESTS.labels(method, route, str(status)).inc()
@@ -0,0 +1,90 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class StatementCounter:
+    """SQL statements executed while the counter was active."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+# Every active counter sees every statement, so a test helper wrapping a
+# request still counts while the request middleware has its own counter
+_counters: ContextVar[Tuple[StatementCounter, ...]] = ContextVar("statement_counters", default=())
+
+TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+@contextmanager
+def count_statements() -> Iterator[StatementCounter]:
+    counter = StatementCounter()
+    token = _counters.set(_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _counters.reset(token)
+
+
+@contextmanager
+def assert_max_statements(limit: int) -> Iterator[StatementCounter]:
+    """
+    Fail when the block runs more than `limit` statements, listing them:
+
+        with assert_max_statements(4):
+            await client.post("/matches/create", json=...)
+    """
+    with count_statements() as counter:
+        yield counter
+
+    if counter.count > limit:
+        raise AssertionError(
+            f"Expected at most {limit} SQL statements, got {counter.count}:\n"
+            + "\n".join(f"  {statement}" for statement in counter.statements)
+        )
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Feed the statements run on the engine to the active counters."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Savepoints only come from tests nesting the request's transaction
+        if statement.startswith(TRANSACTION_CONTROL):
+            return
+        for counter in _counters.get():
+            counter.statements.append(statement)
+
+
+class QueryCountMiddleware:
+    """
+    Counts the statements of each request and reports them in the
+    X-SQL-Statements response header. Statements run after the headers were
+    sent (streamed bodies) are not included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_statements() as counter:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-sql-statements", str(counter.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -1,14 +1,14 @@
 from sqlalchemy import (
-        Column, Integer, String, 
-        DateTime, ForeignKey, UniqueConstraint
+        Column, Integer, String, Float,
+        DateTime, ForeignKey, UniqueConstraint, Index, Uuid, text
 )
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID
 
 from app.core.database import Base
+from app.utils.ratings import INITIAL_RATING
 
 
 class User(SQLAlchemyBaseUserTableUUID, Base):
@@ -32,6 +32,7 @@ class PlayerStats(Base):
 
     __table_args__ = (
        UniqueConstraint('player_id', 'match_type', 'season', name='unique_player_stats'),
+       Index('ix_player_stats_type_season', 'match_type', 'season'),
    )
 
     id = Column(Integer, primary_key=True)
@@ -53,8 +54,22 @@ class PlayerStats(Base):
 
 class Match(Base):
     __tablename__ = "matches"
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    __table_args__ = (
+        # Keyset pagination / date range filters on (created_at, id)
+        Index('ix_matches_created_at_id', 'created_at', 'id'),
+        # Stats replay walks one (match_type, season) in created_at order
+        Index('ix_matches_type_season_created_at', 'match_type', 'season', 'created_at', 'id'),
+        # Drafts are few and listed often, keep them in their own small index
+        Index(
+            'ix_matches_drafts', 'created_at', 'id',
+            postgresql_where=text('blue_score IS NULL'),
+            sqlite_where=text('blue_score IS NULL')
+        ),
+    )
+
+    # Native uuid on Postgres, CHAR(32) elsewhere (same storage as before on SQLite)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     match_type = Column(String, nullable=False)
     season = Column(Integer, default=datetime.utcnow().year)
     blue_score = Column(Integer, nullable=True, default=None)
@@ -68,10 +83,72 @@ class Match(Base):
 class MatchPlayer(Base):
     __tablename__ = "match_players"
 
+    __table_args__ = (
+        Index('ix_match_players_match_id', 'match_id'),
+        Index('ix_match_players_player_id_match_id', 'player_id', 'match_id'),
+    )
+
     id = Column(Integer, primary_key=True)
     match_id = Column(ForeignKey("matches.id"))
     player_id = Column(ForeignKey("players.id"))
     color = Column(String, nullable=False)
+    # Snapshot of the player's efficiency when the match was created
+    efficiency = Column(Float, nullable=True)
+    # Snapshot of the player's rating when the match was created, the odds
+    # come from it (null for matches from before ratings existed)
+    rating = Column(Float, nullable=True)
 
     match = relationship("Match", back_populates="players")
     player = relationship("Player")
+
+
+class Leaderboard(Base):
+    __tablename__ = "leaderboard"
+
+    __table_args__ = (
+        UniqueConstraint('match_type', 'season', 'player_id', name='unique_leaderboard_player'),
+        Index('ix_leaderboard_position', 'match_type', 'season', 'position'),
+    )
+
+    id = Column(Integer, primary_key=True)
+
+    match_type = Column(String, nullable=False)
+    season = Column(Integer, nullable=False)
+    player_id = Column(ForeignKey("players.id"), nullable=False)
+    name = Column(String, nullable=False)
+    position = Column(Integer, nullable=False)
+
+    played = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    otl = Column(Integer, default=0)
+    points = Column(Integer, default=0)
+    winrate = Column(Float, default=0)
+    avg_points = Column(Float, default=0)
+    efficiency = Column(Float, default=0)
+    mmr = Column(Float, default=0)
+
+
+class PlayerRating(Base):
+    __tablename__ = "player_ratings"
+
+    # One Elo rating per player and match type, across seasons (see app/utils/ratings.py)
+    __table_args__ = (
+        UniqueConstraint('player_id', 'match_type', name='unique_player_rating'),
+        Index('ix_player_ratings_rating', 'match_type', 'rating'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    player_id = Column(ForeignKey("players.id"), nullable=False)
+    match_type = Column(String, nullable=False)
+    rating = Column(Float, nullable=False, default=INITIAL_RATING)
+    # Rated matches played, new players move faster for the first few
+    matches = Column(Integer, nullable=False, default=0)
+
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    # One counter per cached resource ("players", "matches"), bumped by writes
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -3,8 +3,11 @@ from pydantic import UUID4, BaseModel, computed_field, EmailStr
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
 from fastapi_users import schemas
 
+from app.utils.ratings import expected_score, team_rating
+
 
 class UserCreate(schemas.BaseUserCreate):
     pass
@@ -38,6 +41,7 @@ class PlayerBase(BaseModel):
     id: int
     name: str
     efficiency: float
+    rating: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -125,6 +129,60 @@ class MatchResultRequest(BaseModel):
     red_score: int
 
 
+def blue_team_odds(blue_team: List[PlayerBase], red_team: List[PlayerBase]) -> float:
+    # Elo expectation from the rating snapshots; matches from before ratings
+    # existed fall back to the ratio of summed efficiencies
+    ratings = [p.rating for p in blue_team + red_team]
+    if ratings and None not in ratings:
+        return expected_score(
+            team_rating([p.rating for p in blue_team]),
+            team_rating([p.rating for p in red_team])
+        )
+
+    blue_eff = sum(p.efficiency for p in blue_team)
+    red_eff = sum(p.efficiency for p in red_team)
+    if blue_eff + red_eff == 0:
+        return 0.5
+    else:
+        return blue_eff / (blue_eff + red_eff)
+
+
+class BalanceMetric(str, Enum):
+    efficiency = "efficiency"
+    mmr = "mmr"
+    rating = "rating"
+
+
+class BalanceRequest(BaseModel):
+    match_type: MatchType
+    players: List[str]
+    metric: BalanceMetric = BalanceMetric.efficiency
+    # 1 returns the most balanced split, more picks one of the top_k at random
+    top_k: int = 1
+    seed: Optional[int] = None
+
+
+class BalanceResponse(BaseModel):
+    match_type: MatchType
+    metric: BalanceMetric
+    blue_team: List[PlayerBase]
+    red_team: List[PlayerBase]
+    blue_total: float
+    red_total: float
+    gap: float
+
+    @computed_field
+    @property
+    def blue_odds(self) -> float:
+        # Same odds MatchResponse will show once the draft is created
+        return blue_team_odds(self.blue_team, self.red_team)
+
+    @computed_field
+    @property
+    def red_odds(self) -> float:
+        return 1 - self.blue_odds
+
+
 class MatchResponse(BaseModel):
     id: UUID4
     match_type: MatchType
@@ -163,7 +221,7 @@ class MatchResponse(BaseModel):
         return self.blue_score >= ot_threshold and self.red_score >= ot_threshold
    
     @computed_field
-    @property
+    @cached_property
     def blue_mvp(self) -> str:
         best_player = self.blue_team[0].name
         best_player_eff = self.blue_team[0].efficiency
@@ -175,7 +233,7 @@ class MatchResponse(BaseModel):
         return best_player
 
     @computed_field
-    @property
+    @cached_property
     def red_mvp(self) -> str:
         best_player = self.red_team[0].name
         best_player_eff = self.red_team[0].efficiency
@@ -187,18 +245,9 @@ class MatchResponse(BaseModel):
         return best_player
     
     @computed_field
-    @property
+    @cached_property
     def blue_odds(self) -> float:
-        blue_eff, red_eff = 0, 0
-        for p in self.blue_team:
-            blue_eff += p.efficiency
-        for p in self.red_team:
-            red_eff += p.efficiency
-        
-        if blue_eff + red_eff == 0:
-            return 0.5
-        else:
-            return blue_eff / (blue_eff + red_eff)
+        return blue_team_odds(self.blue_team, self.red_team)
 
     @computed_field
     @property
@@ -207,3 +256,71 @@ class MatchResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class MatchPage(BaseModel):
+    items: List[MatchResponse]
+    next_cursor: Optional[str] = None
+
+
+class PlayerMatchSummary(BaseModel):
+    id: UUID4
+    match_type: MatchType
+    season: int
+    color: TeamColor
+    blue_score: Optional[int]
+    red_score: Optional[int]
+    result: Optional[str]
+    created_at: datetime
+
+
+class PlayerMatchPage(BaseModel):
+    items: List[PlayerMatchSummary]
+    next_cursor: Optional[str] = None
+
+
+class MatchImportError(BaseModel):
+    line: int
+    error: str
+
+
+class MatchImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[MatchImportError]
+
+
+class LeaderboardEntry(BaseModel):
+    position: int
+    player_id: int
+    name: str
+    played: int
+    wins: int
+    losses: int
+    otl: int
+    points: int
+    winrate: float
+    avg_points: float
+    efficiency: float
+    mmr: float
+
+    class Config:
+        from_attributes = True
+
+
+class LeaderboardPage(BaseModel):
+    items: List[LeaderboardEntry]
+    total: int
+
+
+class RatingEntry(BaseModel):
+    position: int
+    player_id: int
+    name: str
+    rating: float
+    matches: int
+
+
+class RatingPage(BaseModel):
+    items: List[RatingEntry]
+    total: int
@@ -0,0 +1,189 @@
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.core.database import get_async_session
+from app.models.models import Match, MatchPlayer, Player, PlayerStats
+from app.models.schemas import MatchType
+
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Rows pulled from the server-side cursor per round trip
+STREAM_BATCH = 5_000
+
+# Records serialized into one chunk of the response
+CHUNK_SIZE = 500
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+MATCH_COLUMNS = [
+    "id", "match_type", "season", "blue_team", "red_team",
+    "blue_score", "red_score", "played_at",
+]
+
+STATS_COLUMNS = [
+    "player", "match_type", "season", "wins", "losses", "otl",
+    "streak", "longest_streak", "scored", "conceded",
+]
+
+
+def check_format(fmt: str):
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be csv or ndjson"
+        )
+
+
+async def encode(records: AsyncIterator[Dict], fmt: str, columns: List[str]) -> AsyncIterator[str]:
+    """Serialize records into NDJSON or CSV chunks as they arrive."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+
+    count = 0
+    async for record in records:
+        if writer:
+            writer.writerow([
+                ";".join(value) if isinstance(value, list) else value
+                for value in (record[column] for column in columns)
+            ])
+        else:
+            buffer.write(json.dumps(record, default=str))
+            buffer.write("\n")
+
+        count += 1
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def stream_matches(
+    conn: AsyncConnection,
+    match_type: Optional[str],
+    season: Optional[int]
+) -> AsyncIterator[Dict]:
+    query = (
+        select(
+            Match.id,
+            Match.match_type,
+            Match.season,
+            Match.blue_score,
+            Match.red_score,
+            Match.created_at,
+            MatchPlayer.color,
+            Player.name
+        )
+        .join(MatchPlayer, MatchPlayer.match_id == Match.id)
+        .join(Player, Player.id == MatchPlayer.player_id)
+        .filter(Match.blue_score != None)
+        .order_by(Match.created_at, Match.id)
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+
+    if match_type:
+        query = query.filter(Match.match_type == match_type)
+    if season:
+        query = query.filter(Match.season == season)
+
+    # Rows of one match are adjacent, so a record is emitted when the id changes
+    record = None
+    result = await conn.stream(query)
+    async for rows in result.partitions():
+        for row in rows:
+            if record is None or record["id"] != str(row.id):
+                if record is not None:
+                    yield record
+                record = {
+                    "id": str(row.id),
+                    "match_type": row.match_type,
+                    "season": row.season,
+                    "blue_team": [],
+                    "red_team": [],
+                    "blue_score": row.blue_score,
+                    "red_score": row.red_score,
+                    "played_at": row.created_at.isoformat(),
+                }
+            record[f"{row.color}_team"].append(row.name)
+
+    if record is not None:
+        yield record
+
+
+async def stream_player_stats(
+    conn: AsyncConnection,
+    match_type: Optional[str],
+    season: Optional[int]
+) -> AsyncIterator[Dict]:
+    query = (
+        select(
+            Player.name.label("player"),
+            PlayerStats.match_type,
+            PlayerStats.season,
+            PlayerStats.wins,
+            PlayerStats.losses,
+            PlayerStats.otl,
+            PlayerStats.streak,
+            PlayerStats.longest_streak,
+            PlayerStats.scored,
+            PlayerStats.conceded
+        )
+        .join(PlayerStats.player)
+        .order_by(PlayerStats.season, PlayerStats.match_type, Player.name)
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+
+    if match_type:
+        query = query.filter(PlayerStats.match_type == match_type)
+    if season:
+        query = query.filter(PlayerStats.season == season)
+
+    result = await conn.stream(query)
+    async for rows in result.partitions():
+        for row in rows:
+            yield dict(row._mapping)
+
+
+# The session dependency is closed only once the response body is sent, so
+# the generators stream from its connection for as long as they need it.
+@router.get("/matches")
+async def export_matches(
+    fmt: str = Query("ndjson", alias="format"),
+    match_type: Optional[MatchType] = None,
+    season: Optional[int] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    check_format(fmt)
+    conn = await session.connection()
+    return StreamingResponse(
+        encode(stream_matches(conn, match_type, season), fmt, MATCH_COLUMNS),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename=matches.{fmt}"}
+    )
+
+
+@router.get("/player_stats")
+async def export_player_stats(
+    fmt: str = Query("ndjson", alias="format"),
+    match_type: Optional[MatchType] = None,
+    season: Optional[int] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    check_format(fmt)
+    conn = await session.connection()
+    return StreamingResponse(
+        encode(stream_player_stats(conn, match_type, season), fmt, STATS_COLUMNS),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename=player_stats.{fmt}"}
+    )
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime
+
+from app.core.database import get_async_session
+from app.models.models import Leaderboard
+from app.models.schemas import LeaderboardEntry, LeaderboardPage, MatchType
+
+
+router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
+
+
+@router.get("/", response_model=LeaderboardPage)
+async def get_leaderboard(
+    match_type: MatchType = MatchType.indoor,
+    season: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_async_session)
+):
+    if season is None:
+        season = datetime.utcnow().year
+
+    partition = (Leaderboard.match_type == match_type, Leaderboard.season == season)
+
+    # Positions are maintained on write, so a page is a range scan on
+    # ix_leaderboard_position and the total is its last position.
+    total = (
+        select(func.coalesce(func.max(Leaderboard.position), 0))
+        .filter(*partition)
+        .scalar_subquery()
+    )
+
+    response = await session.execute(
+        select(Leaderboard, total)
+        .filter(
+            *partition,
+            Leaderboard.position > offset,
+            Leaderboard.position <= offset + limit
+        )
+        .order_by(Leaderboard.position)
+    )
+    rows = response.all()
+
+    if rows:
+        total_count = rows[0][1]
+    else:
+        # Past the last page there is no row to carry the total
+        total_count = await session.scalar(select(total))
+
+    return LeaderboardPage(
+        items=[LeaderboardEntry.model_validate(entry) for entry, _ in rows],
+        total=total_count
+    )
@@ -1,18 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, insert, select, tuple_, update
+from sqlalchemy.orm import contains_eager, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional 
-from uuid import UUID
-from datetime import date
+from typing import List, Optional, Union
+from uuid import UUID, uuid4
+from datetime import date, datetime
 
-from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.core.database import get_async_session
 from app.core.auth import current_active_user
-from app.models.models import Player, PlayerStats, Match, MatchPlayer, User
-from app.models.schemas import MatchCreate, MatchResponse, MatchResultRequest, PlayerBase, MatchType, TeamColor
-from app.utils.misc_functions import build_match_response, update_player_stats
+from app.core.cache import match_cache
+from app.models.models import Leaderboard, Player, PlayerRating, PlayerStats, Match, MatchPlayer, User
+from app.models.schemas import BalanceMetric, BalanceRequest, BalanceResponse, MatchCreate, MatchImportResult, MatchPage, MatchResponse, MatchResultRequest, PlayerBase, MatchType, TeamColor
+from app.utils.misc_functions import (
+    build_match_response, build_match_responses, bump_versions, decode_cursor, encode_cursor,
+    get_etag, get_player_base, match_response_tags, upsert_player_ratings, upsert_player_stats
+)
+from app.utils.leaderboard import lock_partition, refresh_leaderboard
+from app.utils.rating_replay import rebuild_ratings
+from app.utils.ratings import INITIAL_RATING, rating_changes
+from app.utils.match_import import MatchImporter, iter_lines, iter_records
+from app.utils.replay import recompute_partitions
+from app.utils.fast_json import FastJSONResponse, match_dicts
+from app.utils.team_balance import MAX_BALANCE_PLAYERS, MAX_TOP_K, balance_teams
 
 
 router = APIRouter(prefix="/matches", tags=["matches"])
@@ -40,12 +52,27 @@ async def create_match(
             detail="Players cannot be on both teams"
         )
     
-    # Get all players from database
+    season = datetime.utcnow().year
+
+    # Get all players, with only the stats row the efficiency snapshot needs
+    # and their rating for the match type
     response = await session.execute(
-            select(Player).options(selectinload(Player.stats)).filter(Player.name.in_(all_player_names))
+        select(Player, PlayerRating.rating)
+        .outerjoin(Player.stats.and_(
+            PlayerStats.match_type == request.match_type,
+            PlayerStats.season == season
+        ))
+        .outerjoin(PlayerRating, and_(
+            PlayerRating.player_id == Player.id,
+            PlayerRating.match_type == request.match_type
+        ))
+        .options(contains_eager(Player.stats))
+        .filter(Player.name.in_(all_player_names))
     )
 
-    players = [row[0] for row in response.all()]
+    rows = response.unique().all()
+    players = [player for player, _ in rows]
+    ratings = {player.id: rating for player, rating in rows}
     
     if len(players) != len(all_player_names):
         found_names = {p.name for p in players}
@@ -58,49 +85,212 @@ async def create_match(
     # Create player lookup
     player_lookup = {p.name: p for p in players}
     
-    # Create match (no scores yet - this is a draft)
+    # Create match (no scores yet - this is a draft). The rows are written
+    # with plain inserts and the response is built from these objects, which
+    # never join the session: no flush per player, no refresh, no reload.
+    now = datetime.utcnow()
     new_match = Match(
+        id=uuid4(),
         match_type=request.match_type,
+        season=season,
         blue_score=None,
-        red_score=None
+        red_score=None,
+        created_at=now,
+        updated_at=now
     )
-    session.add(new_match)
-    await session.flush()  # Get the match ID
-    
-    # Add blue team players
-    for player_name in request.blue_team:
-        match_player = MatchPlayer(
-            match_id=new_match.id,
-            player_id=player_lookup[player_name].id,
-            color=TeamColor.blue
+
+    # Snapshot every player's current efficiency and rating
+    for color, team in ((TeamColor.blue, request.blue_team), (TeamColor.red, request.red_team)):
+        for player_name in team:
+            player = player_lookup[player_name]
+            rating = ratings[player.id]
+            new_match.players.append(MatchPlayer(
+                match_id=new_match.id,
+                player_id=player.id,
+                player=player,
+                color=color.value,
+                efficiency=get_player_base(player, request.match_type, season).efficiency,
+                rating=INITIAL_RATING if rating is None else rating
+            ))
+
+    await session.execute(insert(Match).values(
+        id=new_match.id,
+        match_type=new_match.match_type,
+        season=season,
+        created_at=now,
+        updated_at=now
+    ))
+    await session.execute(insert(MatchPlayer), [
+        {
+            "match_id": mp.match_id,
+            "player_id": mp.player_id,
+            "color": mp.color,
+            "efficiency": mp.efficiency,
+            "rating": mp.rating
+        }
+        for mp in new_match.players
+    ])
+
+    await bump_versions(session, "matches")
+
+    await session.commit()
+
+    # A new draft only shows up in unfiltered and draft listings
+    match_cache.invalidate(("list", "all"), ("list", "draft"))
+
+    return build_match_response(new_match)
+
+
+@router.post("/balance", response_model=BalanceResponse)
+async def balance_match(
+    request: BalanceRequest,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Split a pool of players into the two teams whose efficiency (or mmr, or
+    rating) sums are closest, using the current season's stats for the
+    match type.
+    With top_k > 1 one of the top_k most balanced splits is picked at random.
+    Nothing is written, pass the teams to /matches/create.
+    """
+    names = set(request.players)
+    if len(names) != len(request.players):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Players cannot be listed twice"
         )
-        session.add(match_player)
-    
-    # Add red team players
-    for player_name in request.red_team:
-        match_player = MatchPlayer(
-            match_id=new_match.id,
-            player_id=player_lookup[player_name].id,
-            color=TeamColor.red
+    if not 2 <= len(names) <= MAX_BALANCE_PLAYERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Between 2 and {MAX_BALANCE_PLAYERS} players can be balanced"
+        )
+    if not 1 <= request.top_k <= MAX_TOP_K:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"top_k must be between 1 and {MAX_TOP_K}"
         )
-        session.add(match_player)
 
-    await session.commit()
-    await session.refresh(new_match)
+    season = datetime.utcnow().year
+    response = await session.execute(
+        select(
+            Player.id,
+            Player.name,
+            PlayerStats.scored,
+            PlayerStats.conceded,
+            Leaderboard.mmr,
+            PlayerRating.rating
+        )
+        .outerjoin(PlayerStats, and_(
+            PlayerStats.player_id == Player.id,
+            PlayerStats.match_type == request.match_type,
+            PlayerStats.season == season
+        ))
+        .outerjoin(Leaderboard, and_(
+            Leaderboard.player_id == Player.id,
+            Leaderboard.match_type == request.match_type,
+            Leaderboard.season == season
+        ))
+        .outerjoin(PlayerRating, and_(
+            PlayerRating.player_id == Player.id,
+            PlayerRating.match_type == request.match_type
+        ))
+        .filter(Player.name.in_(names))
+    )
+    rows = {row.name: row for row in response.all()}
 
-    result = await session.execute(
-        select(Match)
-        .options(
-            selectinload(Match.players)
-            .selectinload(MatchPlayer.player)
-            .selectinload(Player.stats)
+    missing = names - set(rows)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Players not found: {sorted(missing)}"
         )
-        .filter(Match.id == new_match.id)
+
+    # Request order, so the same pool and seed always give the same split
+    players = [
+        PlayerBase(
+            id=row.id,
+            name=row.name,
+            efficiency=row.scored / row.conceded if row.conceded else 0,
+            rating=INITIAL_RATING if row.rating is None else row.rating
+        )
+        for row in map(rows.get, request.players)
+    ]
+    if request.metric == BalanceMetric.mmr:
+        values = [rows[name].mmr or 0 for name in request.players]
+    elif request.metric == BalanceMetric.rating:
+        values = [player.rating for player in players]
+    else:
+        values = [player.efficiency for player in players]
+
+    # CPU bound for tens of milliseconds at the largest pools, keep it off
+    # the event loop
+    split = await run_in_threadpool(balance_teams, values, request.top_k, request.seed)
+
+    return BalanceResponse(
+        match_type=request.match_type,
+        metric=request.metric,
+        blue_team=[players[i] for i in split.blue],
+        red_team=[players[i] for i in split.red],
+        blue_total=sum(values[i] for i in split.blue),
+        red_total=sum(values[i] for i in split.red),
+        gap=split.gap
     )
 
-    new_match_complete = result.scalar_one_or_none()
 
-    return build_match_response(new_match_complete)
+@router.post("/import", response_model=MatchImportResult)
+async def import_matches(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format"),
+    user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Import completed matches from a streamed CSV or NDJSON body, one match per
+    line. Bad rows are reported and skipped, the rest is committed together.
+    """
+    if fmt is None:
+        fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be csv or ndjson"
+        )
+
+    importer = MatchImporter(session)
+
+    try:
+        async for line, record in iter_records(iter_lines(request.stream()), fmt):
+            await importer.add(line, record)
+    except ValueError as e:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    await importer.flush()
+
+    # Stats and leaderboards are recomputed once for everything touched, the
+    # ratings of each touched match type are replayed from its history. Both
+    # replays fill in the snapshots of the imported rows.
+    if importer.partitions:
+        await recompute_partitions(session, importer.partitions, fill_snapshots=True)
+        await rebuild_ratings(
+            session,
+            sorted({match_type for match_type, _ in importer.partitions}),
+            fill_snapshots=True
+        )
+
+    await session.commit()
+
+    match_cache.clear()
+
+    return MatchImportResult(
+        imported=importer.imported,
+        failed=importer.failed,
+        errors=sorted(importer.errors, key=lambda e: e.line)
+    )
 
 
 @router.put("/{match_id}/results", response_model=MatchResponse)
@@ -110,45 +300,63 @@ async def submit_match_results(
     user: User = Depends(current_active_user),
     session: AsyncSession = Depends(get_async_session)
 ):
-    # Get the match
-    response = await session.execute(
-        select(Match).options(selectinload(Match.players)).filter(Match.id == match_id)
+    # Claim the match: only one submission can move it out of draft
+    claim = await session.execute(
+        update(Match)
+        .where(
+            Match.id == match_id,
+            Match.blue_score == None,
+            Match.red_score == None
+        )
+        .values(blue_score=results.blue_score, red_score=results.red_score)
+        .returning(Match.match_type, Match.season)
     )
 
-    match = response.scalar_one_or_none()
+    claimed = claim.one_or_none()
+
+    if not claimed:
+        exists = await session.scalar(select(Match.id).filter(Match.id == match_id))
+        await session.rollback()
+
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Match not found"
+            )
 
-    if not match:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Match not found"
-        )
-    
-    # Check if results already submitted
-    if match.blue_score is not None or match.red_score is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Match results already submitted"
         )
-    
-    # Update match scores
-    match.blue_score = results.blue_score
-    match.red_score = results.red_score
+
+    match_type, season = claimed
+
+    # Before any stats are written: stats replays hold the partition lock
+    # from their reads to their writes, so they neither miss this result
+    # nor overwrite it
+    await lock_partition(session, match_type, season)
     
     # Determine winner (calculate here, not from match.winner)
     winner = TeamColor.blue if results.blue_score > results.red_score else TeamColor.red
     
     # Calculate if overtime
-    ot_threshold = 24 if match.match_type == MatchType.indoor else 20
+    ot_threshold = 24 if match_type == MatchType.indoor else 20
     is_overtime = results.blue_score >= ot_threshold and results.red_score >= ot_threshold
-    
-    # Get all match players
+
+    # Get all match players with their current rating
     players_response = await session.execute(
-        select(MatchPlayer).filter(MatchPlayer.match_id == match_id)
+        select(MatchPlayer.player_id, MatchPlayer.color, PlayerRating.rating, PlayerRating.matches)
+        .outerjoin(PlayerRating, and_(
+            PlayerRating.player_id == MatchPlayer.player_id,
+            PlayerRating.match_type == match_type
+        ))
+        .filter(MatchPlayer.match_id == match_id)
     )
 
-    match_players = [row[0] for row in players_response.all()]
+    match_players = players_response.all()
     
-    # Update stats for all players in the match
+    # Update stats for all players in the match in one statement
+    player_results = []
     for match_player in match_players:
         player_won = (match_player.color == winner) 
         
@@ -160,27 +368,53 @@ async def submit_match_results(
             team_score = results.red_score
             opp_score = results.blue_score
 
-        await update_player_stats(
-            session=session,
-            player_id=match_player.player_id,
-            match_type=match.match_type,
-            season=match.season,
-            won=player_won,
-            is_overtime=is_overtime,
-            scored=team_score,
-            conceded=opp_score
-        )
+        player_results.append({
+            "player_id": match_player.player_id,
+            "won": player_won,
+            "is_overtime": is_overtime,
+            "scored": team_score,
+            "conceded": opp_score
+        })
+
+    # Rate both teams against each other from their current ratings
+    blue_players = [mp for mp in match_players if mp.color == TeamColor.blue]
+    red_players = [mp for mp in match_players if mp.color == TeamColor.red]
+    blue_deltas, red_deltas = rating_changes(
+        [(INITIAL_RATING if mp.rating is None else mp.rating, mp.matches or 0) for mp in blue_players],
+        [(INITIAL_RATING if mp.rating is None else mp.rating, mp.matches or 0) for mp in red_players],
+        blue_won=winner == TeamColor.blue
+    )
+    rating_results = [
+        {"player_id": mp.player_id, "delta": delta}
+        for mp, delta in zip(blue_players + red_players, blue_deltas + red_deltas)
+    ]
+
+    await upsert_player_stats(session, match_type, season, player_results)
+    await upsert_player_ratings(session, match_type, rating_results)
+
+    await refresh_leaderboard(
+        session,
+        match_type,
+        season,
+        [match_player.player_id for match_player in match_players]
+    )
+
+    await bump_versions(session, "matches", "players")
     
     await session.commit()
 
+    match_cache.invalidate(
+        ("match", match_id),
+        ("list", "all"), ("list", "draft"), ("list", "completed")
+    )
+
     result = await session.execute(
         select(Match)
         .options(
             selectinload(Match.players)
                 .selectinload(MatchPlayer.player)
-                .selectinload(Player.stats)
         )
-        .filter(Match.id == match.id)
+        .filter(Match.id == match_id)
     )
 
     new_match = result.scalar_one_or_none()
@@ -189,12 +423,19 @@ async def submit_match_results(
 
 @router.get("/{match_id}", response_model=MatchResponse)
 async def get_match(match_id: UUID, session: AsyncSession = Depends(get_async_session)):
+    # Keyed on the data version like list_matches
+    cache_key = ("get_match", await get_etag(session, "matches"), match_id)
+    cached = match_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    generation = match_cache.generation
+
     response = await session.execute(
         select(Match)
         .options(
             selectinload(Match.players)
                 .selectinload(MatchPlayer.player)
-                .selectinload(Player.stats)
         )
         .filter(Match.id == match_id)
     )
@@ -207,22 +448,47 @@ async def get_match(match_id: UUID, session: AsyncSession = Depends(get_async_se
             detail="Match not found"
         )
     
-    return build_match_response(match)
+    match_response = build_match_response(match)
+    match_cache.set(cache_key, match_response, match_response_tags(match_response), generation)
+
+    return match_response
 
 
-@router.get("/", response_model=List[MatchResponse])
+@router.get("/", response_model=Union[List[MatchResponse], MatchPage])
 async def list_matches(
+    request: Request,
+    http_response: Response,
     status: str = "all",
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_async_session)
 ):
+    # Read the version before the data so the tag is never newer than the body
+    etag = await get_etag(session, "matches")
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # Keyed on the version, so a write through any worker makes the entries
+    # built before it unreachable, they age out of the LRU
+    cache_key = ("list_matches", etag, status, start_date, end_date, limit, cursor)
+    cached = match_cache.get(cache_key)
+    if cached is not None:
+        if settings.fast_json:
+            return FastJSONResponse(cached, headers={"ETag": etag})
+        http_response.headers["ETag"] = etag
+        return cached
+
+    generation = match_cache.generation
+    http_response.headers["ETag"] = etag
+    list_tag = ("list", status if status in ("draft", "completed") else "all")
+
     query = (
         select(Match)
         .options(
             selectinload(Match.players)
                 .selectinload(MatchPlayer.player)
-                .selectinload(Player.stats)
         )
     )
     
@@ -236,13 +502,69 @@ async def list_matches(
     if end_date:
         query = query.filter(Match.created_at <= end_date)
 
-    query = query.order_by(Match.created_at.desc())
+    # Without a limit keep the legacy behaviour of returning everything
+    if limit is None:
+        query = query.order_by(Match.created_at.desc())
+
+        response = await session.execute(query)
+
+        matches = [row[0] for row in response.all()]
+        
+        if settings.fast_json:
+            match_responses = match_dicts(matches)
+        else:
+            match_responses = build_match_responses(matches)
+        match_cache.set(
+            cache_key, match_responses,
+            set().union({list_tag}, *map(match_response_tags, matches)),
+            generation
+        )
+
+        if settings.fast_json:
+            return FastJSONResponse(match_responses, headers={"ETag": etag})
+        return match_responses
+
+    # Keyset pagination on (created_at, id), newest first
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor"
+            )
+        query = query.filter(
+            tuple_(Match.created_at, Match.id) < tuple_(cursor_created_at, cursor_id)
+        )
+
+    # Fetch one extra row to know whether there is a next page
+    query = query.order_by(Match.created_at.desc(), Match.id.desc()).limit(limit + 1)
 
     response = await session.execute(query)
 
     matches = [row[0] for row in response.all()]
-    
-    return [build_match_response(match) for match in matches]
+
+    next_cursor = None
+    if len(matches) > limit:
+        matches = matches[:limit]
+        next_cursor = encode_cursor(matches[-1].created_at, matches[-1].id)
+
+    if settings.fast_json:
+        page = {"items": match_dicts(matches), "next_cursor": next_cursor}
+    else:
+        page = MatchPage(
+            items=build_match_responses(matches),
+            next_cursor=next_cursor
+        )
+    match_cache.set(
+        cache_key, page,
+        set().union({list_tag}, *map(match_response_tags, matches)),
+        generation
+    )
+
+    if settings.fast_json:
+        return FastJSONResponse(page, headers={"ETag": etag})
+    return page
 
 
 @router.delete("/{match_id}")
@@ -250,28 +572,34 @@ async def delete_match(
     match_id: UUID,
     session: AsyncSession = Depends(get_async_session)
 ):
-    response = await session.execute(
-        select(Match)
-        .options(
-            selectinload(Match.players)
-                .selectinload(MatchPlayer.player)
-                .selectinload(Player.stats)
-        )
-        .filter(Match.id == match_id)
+    # Delete only while it is a draft, players first for the foreign key
+    is_draft = (Match.id == match_id, Match.blue_score == None, Match.red_score == None)
+    await session.execute(
+        delete(MatchPlayer)
+        .where(MatchPlayer.match_id.in_(select(Match.id).where(*is_draft)))
+        .execution_options(synchronize_session=False)
+    )
+    deleted = await session.execute(
+        delete(Match)
+        .where(*is_draft)
+        .returning(Match.id)
+        .execution_options(synchronize_session=False)
     )
 
-    match = response.scalar_one_or_none()
-    if not match:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Player not found"
-        )
-
-    if match.blue_score != None and match.red_score != None:
+    if deleted.one_or_none() is None:
+        exists = await session.scalar(select(Match.id).filter(Match.id == match_id))
+        await session.rollback()
+        if exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Match not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Match has already been registered."
         )
 
-    await session.delete(match)
+    await bump_versions(session, "matches")
     await session.commit()
+
+    match_cache.invalidate(("match", match_id), ("list", "all"), ("list", "draft"))
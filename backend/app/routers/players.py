@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.database import get_async_session
 from app.core.auth import current_active_user
-from app.models.models import Player, PlayerStats, User
-from app.models.schemas import MatchType, PlayerCreate, PlayerResponse
+from app.models.models import Match, MatchPlayer, Player, PlayerStats, User
+from app.models.schemas import MatchType, PlayerCreate, PlayerMatchPage, PlayerMatchSummary, PlayerResponse
+from app.utils.misc_functions import bump_versions, decode_cursor, encode_cursor, get_etag
+from app.utils.leaderboard import refresh_leaderboard
+from app.utils.fast_json import FastJSONResponse, player_dicts
 
 
 router = APIRouter(prefix="/players", tags=["players"])
@@ -51,6 +55,11 @@ async def create_player(
         )
         session.add(stats)
 
+    for match_type in MatchType:
+        await refresh_leaderboard(session, match_type, datetime.utcnow().year, [new_player.id])
+
+    await bump_versions(session, "players")
+
     await session.commit()
 
     result = await session.execute(
@@ -63,13 +72,27 @@ async def create_player(
 
 
 @router.get("/", response_model=List[PlayerResponse])
-async def list_players(session: AsyncSession = Depends(get_async_session)):
+async def list_players(
+    request: Request,
+    http_response: Response,
+    session: AsyncSession = Depends(get_async_session)
+):
+    # Read the version before the data so the tag is never newer than the body
+    etag = await get_etag(session, "players")
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    http_response.headers["ETag"] = etag
+
     response = await session.execute(
         select(Player).options(selectinload(Player.stats)).order_by(Player.name)
     )
 
     players = [row[0] for row in response.all()]
 
+    if settings.fast_json:
+        return FastJSONResponse(player_dicts(players), headers={"ETag": etag})
+
     return players
 
 
@@ -87,3 +110,99 @@ async def get_player(name: str, session: AsyncSession = Depends(get_async_sessio
             detail="Player not found"
         ) 
     return player
+
+
+@router.get("/{name}/matches", response_model=PlayerMatchPage)
+async def list_player_matches(
+    name: str,
+    match_type: Optional[MatchType] = None,
+    season: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    # Walks ix_match_players_player_id_match_id, matches are joined by key
+    query = (
+        select(
+            Match.id,
+            Match.match_type,
+            Match.season,
+            Match.blue_score,
+            Match.red_score,
+            Match.created_at,
+            MatchPlayer.color
+        )
+        .join(MatchPlayer, MatchPlayer.match_id == Match.id)
+        .join(Player, Player.id == MatchPlayer.player_id)
+        .filter(Player.name == name)
+    )
+
+    if match_type:
+        query = query.filter(Match.match_type == match_type)
+    if season:
+        query = query.filter(Match.season == season)
+
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(
+            tuple_(Match.created_at, Match.id) < tuple_(cursor_created_at, cursor_id)
+        )
+
+    # Fetch one extra row to know whether there is a next page
+    query = query.order_by(Match.created_at.desc(), Match.id.desc()).limit(limit + 1)
+
+    response = await session.execute(query)
+    rows = response.all()
+
+    if not rows and not cursor:
+        # Tell an unknown player apart from one without matches
+        exists = await session.scalar(select(Player.id).filter(Player.name == name))
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Player not found"
+            )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    items = []
+    for row in rows:
+        if row.blue_score is None or row.red_score is None:
+            result = None
+        else:
+            if row.color == "blue":
+                team_score, opp_score = row.blue_score, row.red_score
+            else:
+                team_score, opp_score = row.red_score, row.blue_score
+
+            ot_threshold = 24 if row.match_type == MatchType.indoor else 20
+            is_overtime = row.blue_score >= ot_threshold and row.red_score >= ot_threshold
+
+            if team_score > opp_score:
+                result = "win"
+            elif is_overtime:
+                result = "otl"
+            else:
+                result = "loss"
+
+        items.append(PlayerMatchSummary(
+            id=row.id,
+            match_type=row.match_type,
+            season=row.season,
+            color=row.color,
+            blue_score=row.blue_score,
+            red_score=row.red_score,
+            result=result,
+            created_at=row.created_at
+        ))
+
+    return PlayerMatchPage(items=items, next_cursor=next_cursor)
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_session
+from app.models.models import Player, PlayerRating
+from app.models.schemas import MatchType, RatingEntry, RatingPage
+
+
+router = APIRouter(prefix="/ratings", tags=["ratings"])
+
+
+@router.get("/", response_model=RatingPage)
+async def get_ratings(
+    match_type: MatchType = MatchType.indoor,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_async_session)
+):
+    # Players ranked by rating, across seasons; a page walks ix_player_ratings_rating
+    total = (
+        select(func.count())
+        .select_from(PlayerRating)
+        .filter(PlayerRating.match_type == match_type)
+        .scalar_subquery()
+    )
+
+    response = await session.execute(
+        select(PlayerRating.player_id, Player.name, PlayerRating.rating, PlayerRating.matches, total)
+        .join(Player, Player.id == PlayerRating.player_id)
+        .filter(PlayerRating.match_type == match_type)
+        .order_by(PlayerRating.rating.desc(), Player.name)
+        .offset(offset)
+        .limit(limit)
+    )
+    rows = response.all()
+
+    if rows:
+        total_count = rows[0][-1]
+    else:
+        # Past the last page there is no row to carry the total
+        total_count = await session.scalar(select(total))
+
+    return RatingPage(
+        items=[
+            RatingEntry(
+                position=offset + index + 1,
+                player_id=player_id,
+                name=name,
+                rating=rating,
+                matches=matches
+            )
+            for index, (player_id, name, rating, matches, _) in enumerate(rows)
+        ],
+        total=total_count
+    )
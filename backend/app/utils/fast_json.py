@@ -0,0 +1,123 @@
+from typing import Dict, List
+
+import orjson
+from fastapi.responses import Response
+
+from app.models.models import Match, Player, PlayerStats
+from app.models.schemas import MatchType, TeamColor
+from app.utils.ratings import expected_score, team_rating
+
+
+class FastJSONResponse(Response):
+    """
+    orjson-rendered response for payloads that are already plain dicts.
+    Compact and UTF-8 like pydantic's serializer; the one textual difference
+    is that floats of 1e16 and above come out as 1e16 instead of 1e+16.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+# The builders below mirror MatchResponse and PlayerResponse field for field,
+# computed fields included and in the same order, so both paths emit the same
+# document. Keep them in sync with app/models/schemas.py.
+
+def match_dicts(matches: List[Match]) -> List[Dict]:
+    payload = []
+    for match in matches:
+        teams = {TeamColor.blue.value: [], TeamColor.red.value: []}
+        for mp in match.players:
+            teams[mp.color].append({
+                "id": mp.player_id,
+                "name": mp.player.name,
+                "efficiency": float(mp.efficiency or 0),
+                "rating": None if mp.rating is None else float(mp.rating),
+            })
+        blue_team, red_team = teams[TeamColor.blue.value], teams[TeamColor.red.value]
+
+        blue_score, red_score = match.blue_score, match.red_score
+        completed = blue_score is not None and red_score is not None
+
+        if completed:
+            ot_threshold = 24 if match.match_type == MatchType.indoor else 20
+            winner = TeamColor.blue.value if blue_score > red_score else TeamColor.red.value
+            is_overtime = blue_score >= ot_threshold and red_score >= ot_threshold
+        else:
+            winner, is_overtime = None, False
+
+        ratings = [p["rating"] for p in blue_team + red_team]
+        if ratings and None not in ratings:
+            blue_odds = expected_score(
+                team_rating([p["rating"] for p in blue_team]),
+                team_rating([p["rating"] for p in red_team])
+            )
+        else:
+            blue_eff = sum(p["efficiency"] for p in blue_team)
+            red_eff = sum(p["efficiency"] for p in red_team)
+            blue_odds = 0.5 if blue_eff + red_eff == 0 else blue_eff / (blue_eff + red_eff)
+
+        payload.append({
+            "id": match.id,
+            "match_type": match.match_type,
+            "season": match.season,
+            "blue_team": blue_team,
+            "red_team": red_team,
+            "blue_score": blue_score,
+            "red_score": red_score,
+            "created_at": match.created_at,
+            "updated_at": match.updated_at,
+            "status": "completed" if completed else "draft",
+            "winner": winner,
+            "is_overtime": is_overtime,
+            "blue_mvp": _mvp(blue_team),
+            "red_mvp": _mvp(red_team),
+            "blue_odds": blue_odds,
+            "red_odds": 1 - blue_odds,
+        })
+
+    return payload
+
+
+def _mvp(team: List[Dict]) -> str:
+    # First player with the strictly highest efficiency, like MatchResponse
+    best = team[0]
+    for player in team:
+        if player["efficiency"] > best["efficiency"]:
+            best = player
+    return best["name"]
+
+
+def stats_dict(stats: PlayerStats) -> Dict:
+    played = stats.wins + stats.losses + stats.otl
+    points = stats.wins * 2 + stats.otl
+    return {
+        "match_type": stats.match_type,
+        "season": stats.season,
+        "wins": stats.wins,
+        "losses": stats.losses,
+        "otl": stats.otl,
+        "streak": stats.streak,
+        "longest_streak": stats.longest_streak,
+        "scored": stats.scored,
+        "conceded": stats.conceded,
+        "played": played,
+        "points": points,
+        "winrate": stats.wins / played if played else 0.0,
+        "avg_points": points / played if played else 0.0,
+        "efficiency": stats.scored / stats.conceded if stats.conceded else 0.0,
+    }
+
+
+def player_dicts(players: List[Player]) -> List[Dict]:
+    return [
+        {
+            "id": player.id,
+            "name": player.name,
+            "stats": [stats_dict(stats) for stats in player.stats],
+            "created_at": player.created_at,
+            "updated_at": player.updated_at,
+        }
+        for player in players
+    ]
@@ -0,0 +1,239 @@
+import zlib
+from typing import Iterable, Optional
+from sqlalchemy import BigInteger, Float, String, and_, case, cast, delete, func, insert, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.models.models import Leaderboard, Player, PlayerStats
+
+
+LEADERBOARD_COLUMNS = (
+    "match_type", "season", "player_id", "name", "position",
+    "played", "wins", "losses", "otl", "points",
+    "winrate", "avg_points", "efficiency", "mmr",
+)
+
+
+def _ratio(numerator, denominator):
+    # Same convention as PlayerStatsResponse: 0 when there is nothing to divide by
+    return case(
+        (denominator == 0, 0.0),
+        else_=cast(numerator, Float) / denominator
+    )
+
+
+class name_order(FunctionElement):
+    """
+    A name compared in code point order, the order Python sorts str in.
+
+    refresh_leaderboard sorts its window in Python, so every SQL comparison
+    and ORDER BY on names must agree with it whatever the database collation
+    is. SQLite's default BINARY collation already does, Postgres needs "C".
+    """
+    type = String()
+    inherit_cache = True
+
+
+@compiles(name_order)
+def _compile_name_order(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(name_order, "postgresql")
+def _compile_name_order_postgresql(element, compiler, **kw):
+    return f'{compiler.process(element.clauses, **kw)} COLLATE "C"'
+
+
+def ranked_stats_query(match_type: Optional[str] = None, season: Optional[int] = None):
+    """Aggregate player_stats into leaderboard rows, ranked per (match_type, season)."""
+    played = PlayerStats.wins + PlayerStats.losses + PlayerStats.otl
+    points = PlayerStats.wins * 2 + PlayerStats.otl
+
+    stats = (
+        select(
+            PlayerStats.match_type.label("match_type"),
+            PlayerStats.season.label("season"),
+            Player.id.label("player_id"),
+            Player.name.label("name"),
+            played.label("played"),
+            PlayerStats.wins.label("wins"),
+            PlayerStats.losses.label("losses"),
+            PlayerStats.otl.label("otl"),
+            points.label("points"),
+            _ratio(PlayerStats.wins, played).label("winrate"),
+            _ratio(points, played).label("avg_points"),
+            _ratio(PlayerStats.scored, PlayerStats.conceded).label("efficiency"),
+        )
+        .join(PlayerStats.player)
+    )
+
+    if match_type is not None:
+        stats = stats.filter(PlayerStats.match_type == match_type)
+    if season is not None:
+        stats = stats.filter(PlayerStats.season == season)
+
+    stats = stats.subquery()
+
+    return select(
+        stats.c.match_type,
+        stats.c.season,
+        stats.c.player_id,
+        stats.c.name,
+        func.row_number().over(
+            partition_by=(stats.c.match_type, stats.c.season),
+            order_by=(stats.c.points.desc(), name_order(stats.c.name))
+        ).label("position"),
+        stats.c.played,
+        stats.c.wins,
+        stats.c.losses,
+        stats.c.otl,
+        stats.c.points,
+        stats.c.winrate,
+        stats.c.avg_points,
+        stats.c.efficiency,
+        (stats.c.avg_points * stats.c.efficiency).label("mmr"),
+    )
+
+
+async def lock_partition(session: AsyncSession, match_type: str, season: int):
+    """
+    Serialize stats and leaderboard writers of one (match_type, season) until
+    the end of the caller's transaction, so concurrent re-ranks never
+    interleave and stats replays never race a submission.
+
+    Postgres takes a transaction-level advisory lock. SQLite already allows
+    a single writer, and every caller has written before re-ranking.
+    """
+    if session.bind.dialect.name != "postgresql":
+        return
+
+    key = zlib.crc32(f"leaderboard:{match_type}:{season}".encode())
+    await session.execute(select(func.pg_advisory_xact_lock(literal(key, BigInteger))))
+
+
+def _apply_stats(entry: Leaderboard, stats: PlayerStats, name: str):
+    # Python mirror of ranked_stats_query for a single row
+    played = stats.wins + stats.losses + stats.otl
+    points = stats.wins * 2 + stats.otl
+
+    entry.name = name
+    entry.played = played
+    entry.wins = stats.wins
+    entry.losses = stats.losses
+    entry.otl = stats.otl
+    entry.points = points
+    entry.winrate = stats.wins / played if played else 0.0
+    entry.avg_points = points / played if played else 0.0
+    entry.efficiency = stats.scored / stats.conceded if stats.conceded else 0.0
+    entry.mmr = entry.avg_points * entry.efficiency
+
+
+async def refresh_leaderboard(
+    session: AsyncSession,
+    match_type: str,
+    season: int,
+    player_ids: Iterable[int]
+):
+    """
+    Update the leaderboard rows of the given players and re-rank only the
+    slice of positions they moved across.
+    """
+    player_ids = list(set(player_ids))
+    partition = (Leaderboard.match_type == match_type, Leaderboard.season == season)
+
+    # The window below is read, re-ranked and written back, which is only
+    # right while no other transaction moves positions in the partition
+    await lock_partition(session, match_type, season)
+
+    response = await session.execute(
+        select(PlayerStats, Player.name)
+        .join(PlayerStats.player)
+        .filter(
+            PlayerStats.player_id.in_(player_ids),
+            PlayerStats.match_type == match_type,
+            PlayerStats.season == season
+        )
+    )
+    stats_rows = response.all()
+    if not stats_rows:
+        return
+
+    response = await session.execute(
+        select(Leaderboard).filter(*partition, Leaderboard.player_id.in_(player_ids))
+    )
+    entries = {entry.player_id: entry for entry in response.scalars()}
+
+    size = await session.scalar(
+        select(func.count()).select_from(Leaderboard).filter(*partition)
+    )
+
+    movers = []
+    for stats, name in stats_rows:
+        entry = entries.get(stats.player_id)
+        if entry is None:
+            # New players join at the bottom and climb from there
+            size += 1
+            entry = Leaderboard(
+                match_type=match_type,
+                season=season,
+                player_id=stats.player_id,
+                position=size
+            )
+            session.add(entry)
+
+        _apply_stats(entry, stats, name)
+        movers.append(entry)
+
+    # Points only grow, so movers can only climb. Everything between the best
+    # mover's new position and the worst mover's old position is re-ranked,
+    # rows outside that window keep their position.
+    best = min(movers, key=lambda e: (-e.points, e.name))
+    above = await session.scalar(
+        select(func.count()).select_from(Leaderboard).filter(
+            *partition,
+            Leaderboard.player_id.notin_(player_ids),
+            or_(
+                Leaderboard.points > best.points,
+                and_(Leaderboard.points == best.points, name_order(Leaderboard.name) < best.name)
+            )
+        )
+    )
+    lo = above + 1
+    hi = max(entry.position for entry in movers)
+
+    response = await session.execute(
+        select(Leaderboard).filter(
+            *partition,
+            Leaderboard.player_id.notin_(player_ids),
+            Leaderboard.position.between(lo, hi)
+        )
+    )
+    window = list(response.scalars()) + movers
+    window.sort(key=lambda e: (-e.points, e.name))
+
+    for offset, entry in enumerate(window):
+        entry.position = lo + offset
+
+
+async def rebuild_leaderboard(
+    session: AsyncSession,
+    match_type: Optional[str] = None,
+    season: Optional[int] = None
+):
+    """Recompute the leaderboard from player_stats, covering any drift."""
+    if match_type is not None and season is not None:
+        await lock_partition(session, match_type, season)
+
+    query = delete(Leaderboard)
+    if match_type is not None:
+        query = query.filter(Leaderboard.match_type == match_type)
+    if season is not None:
+        query = query.filter(Leaderboard.season == season)
+
+    await session.execute(query)
+    await session.execute(
+        insert(Leaderboard).from_select(
+            LEADERBOARD_COLUMNS, ranked_stats_query(match_type, season)
+        )
+    )
@@ -0,0 +1,241 @@
+import math
+import random
+import uuid
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Match, MatchPlayer, Player, PlayerStats
+from app.models.schemas import MatchType, TeamColor
+from app.utils.leaderboard import rebuild_leaderboard
+from app.utils.match_import import bulk_insert
+from app.utils.rating_replay import rebuild_ratings
+from app.utils.misc_functions import bump_versions
+from app.utils.replay import STAT_FIELDS, apply_result
+
+
+# Matches generated and inserted together
+GENERATE_BATCH = 10_000
+
+# Share of indoor matches, the rest is beach
+INDOOR_SHARE = 0.65
+
+# End of the generated history unless told otherwise. Fixed, so the same
+# arguments give the same rows on any day
+DEFAULT_UNTIL = datetime(2025, 7, 1)
+
+# Points to win and the overtime threshold (see MatchResponse.is_overtime)
+RULES = {
+    MatchType.indoor.value: (25, 24),
+    MatchType.beach.value: (21, 20),
+}
+
+# Players per team and how often each size shows up
+TEAM_SIZES = {
+    MatchType.indoor.value: ([6, 5, 4], [0.75, 0.15, 0.10]),
+    MatchType.beach.value: ([2, 3, 4], [0.70, 0.20, 0.10]),
+}
+
+
+@dataclass
+class LeagueReport:
+    players: int = 0
+    matches: int = 0
+    overtime: int = 0
+    partitions: List[Tuple[str, int]] = field(default_factory=list)
+
+
+class LeagueGenerator:
+    """
+    Deterministic synthetic league: every random draw comes from one seeded
+    RNG, so the same arguments always produce the same rows.
+
+    Players get a hidden skill and a heavy-tailed activity weight. A team's
+    chance to win follows the skill gap, and close matches go to overtime
+    more often. Stats are accumulated with the same rules as
+    submit_match_results while matches are generated in created_at order,
+    so player_stats, the snapshots and a later replay agree.
+
+    Matches are spread evenly from January 1st of the first season until
+    `until` (DEFAULT_UNTIL by default).
+    """
+
+    def __init__(
+        self,
+        players: int,
+        seasons: int,
+        seed: int = 0,
+        prefix: str = "gen",
+        until: datetime = DEFAULT_UNTIL
+    ):
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.names = [f"{prefix}-{i:06d}" for i in range(players)]
+        self.skill = [self.rng.gauss(0, 1) for _ in range(players)]
+        self.cumulative_weights = list(accumulate(
+            self.rng.paretovariate(1.5) for _ in range(players)
+        ))
+
+        self.start = datetime(until.year - seasons + 1, 1, 1)
+        self.end = until
+        self.span = timedelta(0)
+
+        self.stats: Dict[Tuple[str, int, int], Dict] = {}
+
+    def pick_players(self, count: int) -> List[int]:
+        # Weighted sampling without replacement, by redrawing duplicates
+        total = self.cumulative_weights[-1]
+        picked, seen = [], set()
+        while len(picked) < count:
+            index = bisect_left(self.cumulative_weights, self.rng.random() * total)
+            if index not in seen:
+                seen.add(index)
+                picked.append(index)
+        return picked
+
+    def play(self, match_type: str, blue: List[int], red: List[int]) -> Tuple[int, int]:
+        target, ot_threshold = RULES[match_type]
+
+        gap = sum(self.skill[i] for i in blue) / len(blue) - sum(self.skill[i] for i in red) / len(red)
+        blue_chance = 1 / (1 + math.exp(-1.5 * gap))
+        closeness = 1 - abs(blue_chance - 0.5) * 2
+
+        if self.rng.random() < 0.04 + 0.12 * closeness:
+            loser = ot_threshold + min(int(self.rng.expovariate(0.7)), 10)
+            winner = loser + 2
+        else:
+            winner = target
+            margin = 2 + int(self.rng.expovariate(0.12 + 0.25 * (1 - closeness)))
+            loser = max(0, target - margin)
+
+        if self.rng.random() < blue_chance:
+            return winner, loser
+        return loser, winner
+
+    def generate(self, player_ids: List[int], count: int, offset: int) -> Tuple[List[Dict], List[Dict], int]:
+        """Matches number offset to offset + count, with their players and stats applied."""
+        matches, match_players, overtime = [], [], 0
+
+        for number in range(offset, offset + count):
+            match_type = (
+                MatchType.indoor.value if self.rng.random() < INDOOR_SHARE else MatchType.beach.value
+            )
+            sizes, weights = TEAM_SIZES[match_type]
+            team_size = self.rng.choices(sizes, weights)[0]
+            roster = self.pick_players(2 * team_size)
+            blue, red = roster[:team_size], roster[team_size:]
+
+            blue_score, red_score = self.play(match_type, blue, red)
+            ot_threshold = RULES[match_type][1]
+            is_overtime = blue_score >= ot_threshold and red_score >= ot_threshold
+            overtime += is_overtime
+
+            created_at = self.start + self.span * number
+            season = created_at.year
+            match_id = uuid.UUID(int=self.rng.getrandbits(128), version=4)
+            matches.append({
+                "id": match_id,
+                "match_type": match_type,
+                "season": season,
+                "blue_score": blue_score,
+                "red_score": red_score,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+
+            for color, team, scored, conceded in (
+                (TeamColor.blue.value, blue, blue_score, red_score),
+                (TeamColor.red.value, red, red_score, blue_score),
+            ):
+                for index in team:
+                    player_id = player_ids[index]
+                    stats = self.stats.get((match_type, season, player_id))
+                    if stats is None:
+                        stats = self.stats[(match_type, season, player_id)] = dict.fromkeys(STAT_FIELDS, 0)
+
+                    # Snapshot taken when the match was created, before its result
+                    match_players.append({
+                        "match_id": match_id,
+                        "player_id": player_id,
+                        "color": color,
+                        "efficiency": stats["scored"] / stats["conceded"] if stats["conceded"] else 0,
+                    })
+                    apply_result(stats, scored > conceded, is_overtime, scored, conceded)
+
+        return matches, match_players, overtime
+
+    async def run(self, session: AsyncSession, matches: int) -> LeagueReport:
+        largest_match = 2 * max(max(sizes) for sizes, _ in TEAM_SIZES.values())
+        if len(self.names) < largest_match:
+            raise ValueError(f"At least {largest_match} players are needed")
+
+        self.span = (self.end - self.start) / max(matches, 1)
+        report = LeagueReport(players=len(self.names))
+
+        existing = await session.scalar(
+            select(func.count()).select_from(Player).filter(Player.name.like(f"{self.prefix}-%"))
+        )
+        if existing:
+            raise ValueError("Players with these generated names already exist, use another prefix")
+
+        await bulk_insert(session, Player, [
+            {"name": name, "created_at": self.start, "updated_at": self.start} for name in self.names
+        ])
+        response = await session.execute(
+            select(Player.name, Player.id).filter(Player.name.like(f"{self.prefix}-%"))
+        )
+        ids_by_name = dict(response.all())
+        player_ids = [ids_by_name[name] for name in self.names]
+
+        for offset in range(0, matches, GENERATE_BATCH):
+            batch, batch_players, overtime = self.generate(
+                player_ids, min(GENERATE_BATCH, matches - offset), offset
+            )
+            await bulk_insert(session, Match, batch)
+            await bulk_insert(session, MatchPlayer, batch_players)
+            report.matches += len(batch)
+            report.overtime += overtime
+
+        # New players start with an empty row per match type for the current
+        # season, like create_player does
+        for match_type in MatchType:
+            for player_id in player_ids:
+                self.stats.setdefault((match_type.value, self.end.year, player_id), dict.fromkeys(STAT_FIELDS, 0))
+
+        partitions: Dict[Tuple[str, int], List[Dict]] = {}
+        for (match_type, season, player_id), stats in self.stats.items():
+            partitions.setdefault((match_type, season), []).append(
+                {"player_id": player_id, "match_type": match_type, "season": season, **stats}
+            )
+
+        # Every row belongs to a new player, so plain inserts cannot conflict
+        for (match_type, season), rows in sorted(partitions.items()):
+            await bulk_insert(session, PlayerStats, rows)
+            await rebuild_leaderboard(session, match_type, season)
+
+        # Ratings follow from the history alone, replay it like the command
+        # does. The replay also gives every generated row its rating
+        # snapshot, as it does for imports.
+        await rebuild_ratings(session, fill_snapshots=True)
+
+        await bump_versions(session, "players", "matches")
+
+        report.partitions = sorted(partitions)
+        return report
+
+
+async def generate_league(
+    session: AsyncSession,
+    players: int,
+    matches: int,
+    seasons: int,
+    seed: int = 0,
+    prefix: str = "gen",
+    until: datetime = DEFAULT_UNTIL
+) -> LeagueReport:
+    """Insert a synthetic league into the session's transaction; the caller commits."""
+    return await LeagueGenerator(players, seasons, seed, prefix, until).run(session, matches)
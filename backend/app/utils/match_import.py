@@ -0,0 +1,247 @@
+import csv
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.models.models import Match, MatchPlayer, Player
+from app.models.schemas import MatchImportError, MatchType, TeamColor
+
+
+# Rows resolved and inserted together
+IMPORT_BATCH = 1_000
+
+# Row errors reported back in full, the rest are only counted
+MAX_REPORTED_ERRORS = 1_000
+
+CSV_COLUMNS = ("match_type", "blue_team", "red_team", "blue_score", "red_score")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Holds at most one partial line of the streamed body
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Tuple[int, object]]:
+    """Yield (line number, dict or parse error message) for every non-empty line."""
+    header = None
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+
+        if fmt == "ndjson":
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, f"Invalid JSON: {e}"
+            continue
+
+        # CSV, one match per line with teams separated by ';'
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [value.strip() for value in values]
+            missing = set(CSV_COLUMNS) - set(header)
+            if missing:
+                raise ValueError(f"CSV header is missing columns: {sorted(missing)}")
+            continue
+
+        if len(values) != len(header):
+            yield number, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+
+        record = dict(zip(header, values))
+        for team in ("blue_team", "red_team"):
+            record[team] = [name.strip() for name in record[team].split(";") if name.strip()]
+        yield number, record
+
+
+def parse_record(record: Dict) -> Dict:
+    """Validate one record into a match row, raising ValueError with the reason."""
+    if not isinstance(record, dict):
+        raise ValueError("Expected an object")
+
+    try:
+        match_type = MatchType(record.get("match_type"))
+    except ValueError:
+        raise ValueError(f"Unknown match_type: {record.get('match_type')!r}")
+
+    blue_team, red_team = record.get("blue_team"), record.get("red_team")
+    if not isinstance(blue_team, list) or not isinstance(red_team, list) or not blue_team or not red_team:
+        raise ValueError("Both blue_team and red_team must have at least one player")
+    if not all(isinstance(name, str) and name for name in blue_team + red_team):
+        raise ValueError("Player names must be non-empty strings")
+    if len(set(blue_team + red_team)) != len(blue_team) + len(red_team):
+        raise ValueError("Players cannot be on both teams")
+
+    try:
+        blue_score, red_score = int(record.get("blue_score")), int(record.get("red_score"))
+    except (TypeError, ValueError):
+        raise ValueError("blue_score and red_score must be integers")
+    if blue_score == red_score:
+        raise ValueError("Matches cannot end in a tie")
+
+    played_at = record.get("played_at")
+    if played_at:
+        if not isinstance(played_at, str):
+            raise ValueError("played_at must be an ISO 8601 string")
+        played_at = datetime.fromisoformat(played_at)
+        if played_at.tzinfo is not None:
+            # Timestamps are stored as naive UTC
+            played_at = played_at.astimezone(timezone.utc).replace(tzinfo=None)
+    else:
+        played_at = datetime.utcnow()
+
+    season = record.get("season")
+    try:
+        season = int(season) if season else played_at.year
+    except (TypeError, ValueError):
+        raise ValueError("season must be an integer")
+
+    return {
+        "match_type": match_type.value,
+        "season": season,
+        "blue_team": blue_team,
+        "red_team": red_team,
+        "blue_score": blue_score,
+        "red_score": red_score,
+        "played_at": played_at,
+    }
+
+
+class MatchImporter:
+    """
+    Resolve and insert parsed matches batch by batch inside one transaction.
+
+    Imported matches can land anywhere in the history, so their efficiency
+    and rating snapshots are only known once the touched partitions have
+    been replayed. Rows go in without them and the replays fill them in.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.player_ids: Dict[str, int] = {}
+        self.partitions: Set[Tuple[str, int]] = set()
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[MatchImportError] = []
+        self.batch: List[Tuple[int, Dict]] = []
+
+    def fail(self, line: int, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(MatchImportError(line=line, error=error))
+
+    async def add(self, line: int, record: object):
+        if isinstance(record, str):
+            self.fail(line, record)
+            return
+
+        try:
+            self.batch.append((line, parse_record(record)))
+        except ValueError as e:
+            self.fail(line, str(e))
+            return
+
+        if len(self.batch) >= IMPORT_BATCH:
+            await self.flush()
+
+    async def flush(self):
+        batch, self.batch = self.batch, []
+        if not batch:
+            return
+
+        # Resolve every name of the batch we have not seen yet in one query
+        unknown = {
+            name
+            for _, row in batch
+            for name in row["blue_team"] + row["red_team"]
+            if name not in self.player_ids
+        }
+        if unknown:
+            response = await self.session.execute(
+                select(Player.name, Player.id).filter(Player.name.in_(unknown))
+            )
+            self.player_ids.update(response.all())
+
+        now = datetime.utcnow()
+        matches, match_players = [], []
+        for line, row in batch:
+            missing = [
+                name for name in row["blue_team"] + row["red_team"]
+                if name not in self.player_ids
+            ]
+            if missing:
+                self.fail(line, f"Players not found: {missing}")
+                continue
+
+            match_id = uuid.uuid4()
+            matches.append({
+                "id": match_id,
+                "match_type": row["match_type"],
+                "season": row["season"],
+                "blue_score": row["blue_score"],
+                "red_score": row["red_score"],
+                "created_at": row["played_at"],
+                "updated_at": now,
+            })
+            for color, team in ((TeamColor.blue.value, row["blue_team"]), (TeamColor.red.value, row["red_team"])):
+                for name in team:
+                    match_players.append({
+                        "match_id": match_id,
+                        "player_id": self.player_ids[name],
+                        "color": color,
+                    })
+
+            self.partitions.add((row["match_type"], row["season"]))
+
+        if matches:
+            await self.insert(Match, matches)
+            await self.insert(MatchPlayer, match_players)
+            self.imported += len(matches)
+
+    async def insert(self, model, rows: List[Dict]):
+        await bulk_insert(self.session, model, rows)
+
+
+async def bulk_insert(session: AsyncSession, model, rows: List[Dict]):
+    """Insert plain rows in the session's transaction, through COPY on Postgres."""
+    if not rows:
+        return
+
+    if session.bind.dialect.name == "postgresql":
+        # COPY through the session's own asyncpg connection and transaction
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        columns = list(rows[0])
+        await raw.driver_connection.copy_records_to_table(
+            model.__tablename__,
+            records=[tuple(row[column] for column in columns) for row in rows],
+            columns=columns
+        )
+    else:
+        await session.execute(insert(model), rows)
+
+
+async def write_snapshots(connection: Union[AsyncConnection, AsyncSession], column: str, rows: List[Dict]):
+    """Set one snapshot column of match_players, rows are {"b_id", "b_value"}."""
+    if not rows:
+        return
+
+    table = MatchPlayer.__table__
+    await connection.execute(
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values({column: bindparam("b_value")}),
+        rows
+    )
@@ -1,11 +1,21 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import case, select
 
-from app.models.models import Match, MatchPlayer, Player, PlayerStats
+from app.models.models import DataVersion, Match, MatchPlayer, Player, PlayerRating, PlayerStats
 from app.models.schemas import PlayerBase, MatchResponse, MatchType, TeamColor
+from app.utils.ratings import INITIAL_RATING
 
 
-def get_player_base(player: Player, match_type: MatchType, season: int) -> PlayerBase:
+def get_player_base(
+    player: Player,
+    match_type: MatchType,
+    season: int,
+    rating: Optional[float] = None
+) -> PlayerBase:
     stats = next(
         (s for s in player.stats if s.match_type == match_type and s.season == season),
         None
@@ -19,85 +29,180 @@ def get_player_base(player: Player, match_type: MatchType, season: int) -> Playe
     else:
         efficiency = scored / conceded
 
-    return PlayerBase(id=player.id, name=player.name, efficiency=efficiency)
+    return PlayerBase(id=player.id, name=player.name, efficiency=efficiency, rating=rating)
 
 
 def build_match_response(match: Match) -> MatchResponse:
-    
-    blue_team_players = [
-        get_player_base(mp.player, match.match_type, match.season)
-        for mp in match.players if mp.color == TeamColor.blue
-    ]
-    
-    red_team_players = [
-        get_player_base(mp.player, match.match_type, match.season)
-        for mp in match.players if mp.color == TeamColor.red
-    ]
-    
-    return MatchResponse(
-        id=match.id,
-        match_type=match.match_type,
-        season=match.season,
-        blue_team=blue_team_players,
-        red_team=red_team_players,
-        blue_score=match.blue_score,
-        red_score=match.red_score,
-        created_at=match.created_at,
-        updated_at=match.updated_at
-    )
+    return build_match_responses([match])[0]
+
+
+def build_match_responses(matches: List[Match]) -> List[MatchResponse]:
+    """
+    Assemble responses for a batch of loaded matches, splitting each match's
+    players into teams in a single pass.
+    """
+    responses = []
+    for match in matches:
+        teams = {TeamColor.blue.value: [], TeamColor.red.value: []}
+        for mp in match.players:
+            teams[mp.color].append(PlayerBase(
+                id=mp.player_id,
+                name=mp.player.name,
+                efficiency=mp.efficiency or 0,
+                rating=mp.rating
+            ))
+
+        responses.append(MatchResponse(
+            id=match.id,
+            match_type=match.match_type,
+            season=match.season,
+            blue_team=teams[TeamColor.blue.value],
+            red_team=teams[TeamColor.red.value],
+            blue_score=match.blue_score,
+            red_score=match.red_score,
+            created_at=match.created_at,
+            updated_at=match.updated_at
+        ))
+
+    return responses
+
+
+def match_response_tags(match: Match) -> Set[Tuple]:
+    # Efficiencies are snapshots, so only the match itself can go stale
+    return {("match", match.id)}
+
+
+def encode_cursor(created_at: datetime, match_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{match_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    # Raises ValueError on anything that is not a cursor we handed out
+    padded = cursor + "=" * (-len(cursor) % 4)
+    raw = base64.urlsafe_b64decode(padded.encode()).decode()
+    created_at, match_id = raw.split("|")
+    return datetime.fromisoformat(created_at), uuid.UUID(match_id)
+
+
+def _insert_for(session: AsyncSession):
+    # ON CONFLICT is dialect specific, both backends we run on support it
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
 
 
-async def update_player_stats(
+async def upsert_player_stats(
     session: AsyncSession,
-    player_id: int,
     match_type: MatchType,
     season: int,
-    won: bool,
-    is_overtime: bool,
-    scored: int,
-    conceded: int
+    results: List[Dict]
 ):
-    # Try to get existing stats
-    response = await session.execute(
-                select(PlayerStats).filter(
-                    PlayerStats.player_id == player_id,
-                    PlayerStats.match_type == match_type,
-                    PlayerStats.season == season
-                )
+    """
+    Apply one match result to every participant in a single
+    INSERT ... ON CONFLICT (player_id, match_type, season) DO UPDATE.
+
+    Each result holds player_id, won, is_overtime, scored and conceded.
+    Counters are incremented from the stored row, so concurrent submissions
+    for the same players never lose updates.
+    """
+    if not results:
+        return
+
+    rows = []
+    # Lock rows in a fixed order so overlapping submissions cannot deadlock
+    for result in sorted(results, key=lambda r: r["player_id"]):
+        won = result["won"]
+        otl = not won and result["is_overtime"]
+        rows.append({
+            "player_id": result["player_id"],
+            "match_type": match_type,
+            "season": season,
+            "wins": int(won),
+            "losses": int(not won and not otl),
+            "otl": int(otl),
+            "streak": int(won),
+            "longest_streak": int(won),
+            "scored": result["scored"],
+            "conceded": result["conceded"],
+        })
+
+    insert = _insert_for(session)
+    statement = insert(PlayerStats).values(rows)
+    new = statement.excluded
+
+    # In DO UPDATE the bare columns are the stored row, `new` is this match
+    streak = case((new.wins == 1, PlayerStats.streak + 1), else_=0)
+
+    statement = statement.on_conflict_do_update(
+        index_elements=["player_id", "match_type", "season"],
+        set_={
+            "wins": PlayerStats.wins + new.wins,
+            "losses": PlayerStats.losses + new.losses,
+            "otl": PlayerStats.otl + new.otl,
+            "streak": streak,
+            "longest_streak": case(
+                (streak > PlayerStats.longest_streak, streak),
+                else_=PlayerStats.longest_streak
+            ),
+            "scored": PlayerStats.scored + new.scored,
+            "conceded": PlayerStats.conceded + new.conceded,
+        }
     )
 
-    stats = response.scalar_one_or_none()
-    
-    if not stats:
-        stats = PlayerStats(
-            player_id=player_id,
-            match_type=match_type,
-            season=season,
-            wins=0,
-            losses=0,
-            otl=0,
-            streak=0,
-            longest_streak=0,
-            scored=0,
-            conceded=0
-        )
-        session.add(stats)
-
-    # Update stats based on result
-    if won:
-        stats.wins += 1
-        stats.streak += 1
-        
-        if stats.streak > stats.longest_streak:
-            stats.longest_streak = stats.streak
-
-    elif is_overtime:
-        stats.otl += 1
-        stats.streak = 0
-    else:
-        stats.losses += 1
-        stats.streak = 0
+    await session.execute(statement)
+
+
+async def upsert_player_ratings(session: AsyncSession, match_type: MatchType, changes: List[Dict]):
+    """
+    Apply one match's rating changes, each a player_id and delta, in a single
+    INSERT ... ON CONFLICT (player_id, match_type) DO UPDATE. Like the stats,
+    ratings are moved from the stored row rather than overwritten.
+    """
+    if not changes:
+        return
+
+    rows = [
+        {
+            "player_id": change["player_id"],
+            "match_type": match_type,
+            "rating": INITIAL_RATING + change["delta"],
+            "matches": 1,
+        }
+        # Same lock order as upsert_player_stats
+        for change in sorted(changes, key=lambda c: c["player_id"])
+    ]
+
+    insert = _insert_for(session)
+    statement = insert(PlayerRating).values(rows)
+    new = statement.excluded
+
+    statement = statement.on_conflict_do_update(
+        index_elements=["player_id", "match_type"],
+        set_={
+            "rating": PlayerRating.rating + (new.rating - INITIAL_RATING),
+            "matches": PlayerRating.matches + 1,
+        }
+    )
+
+    await session.execute(statement)
 
-    # Update scored/conceded fields
-    stats.scored += scored
-    stats.conceded += conceded
+
+async def bump_versions(session: AsyncSession, *names: str):
+    # Part of the caller's transaction, so readers see it together with the write
+    insert = _insert_for(session)
+    statement = insert(DataVersion).values([{"name": name, "version": 1} for name in names])
+    statement = statement.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"version": DataVersion.version + 1}
+    )
+    await session.execute(statement)
+
+
+async def get_etag(session: AsyncSession, name: str) -> str:
+    version = await session.scalar(
+        select(DataVersion.version).filter(DataVersion.name == name)
+    )
+    return f'"{name}-{version or 0}"'
@@ -0,0 +1,200 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import String, case, delete, null, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Match, MatchPlayer, PlayerRating
+from app.models.schemas import MatchType, TeamColor
+from app.utils.match_import import bulk_insert, write_snapshots
+from app.utils.ratings import (
+    INITIAL_RATING, K_FACTOR, PROVISIONAL_K_FACTOR, PROVISIONAL_MATCHES, RATING_SCALE
+)
+
+
+# Rows pulled from the server-side cursor per round trip
+STREAM_BATCH = 10_000
+
+# Rating snapshots per UPDATE
+WRITE_BATCH = 1_000
+
+
+@dataclass
+class RatingReplay:
+    ratings: np.ndarray
+    matches: np.ndarray
+    # Rating of each row's player going into its match
+    before: np.ndarray
+    # Mean squared error of the pre-match win probabilities, 0.25 is a coin flip
+    brier: float
+    rated_matches: int
+
+
+def schedule_waves(match_index: np.ndarray, player_index: np.ndarray, players: int) -> np.ndarray:
+    """
+    Wave of every match: one past the latest wave any of its players was in.
+    Matches of a wave share no player and only depend on earlier waves, so a
+    wave can be scored all at once and the result equals a match by match
+    replay.
+    """
+    starts = np.flatnonzero(np.r_[True, match_index[1:] != match_index[:-1]])
+    ends = np.r_[starts[1:], len(match_index)]
+
+    last_wave = [0] * players
+    waves = np.empty(len(starts), dtype=np.int64)
+    roster = player_index.tolist()
+    for match, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        wave = max(last_wave[p] for p in roster[start:end]) + 1
+        for p in roster[start:end]:
+            last_wave[p] = wave
+        waves[match] = wave
+
+    return waves
+
+
+def replay(
+    match_index: np.ndarray,
+    player_index: np.ndarray,
+    is_blue: np.ndarray,
+    blue_won: np.ndarray,
+    players: int
+) -> RatingReplay:
+    """
+    Elo replay of a match history with the rules of app/utils/ratings.py.
+
+    One row per match player: match_index counts matches 0..n-1 in the order
+    they were played, rows of a match are adjacent. blue_won has one entry
+    per match. Every wave of independent matches is one vectorized update.
+    """
+    ratings = np.full(players, INITIAL_RATING)
+    played = np.zeros(players, dtype=np.int64)
+    before = np.empty(len(match_index))
+    if len(match_index) == 0:
+        return RatingReplay(ratings, played, before, 0.0, 0)
+
+    waves = schedule_waves(match_index, player_index, players)
+    row_waves = waves[match_index]
+    order = np.argsort(row_waves, kind="stable")
+    bounds = np.flatnonzero(np.diff(row_waves[order])) + 1
+
+    blue_weight = is_blue.astype(np.float64)
+    outcome = blue_won.astype(np.float64)
+    squared_error = 0.0
+
+    for rows in np.split(order, bounds):
+        p, blue = player_index[rows], blue_weight[rows]
+        matches, local = np.unique(match_index[rows], return_inverse=True)
+
+        # Team means as sums over each match's rows
+        current = ratings[p]
+        before[rows] = current
+        blue_count = np.bincount(local, weights=blue)
+        red_count = np.bincount(local, weights=1 - blue)
+        blue_mean = np.bincount(local, weights=current * blue) / blue_count
+        red_mean = np.bincount(local, weights=current * (1 - blue)) / red_count
+
+        expected = 1 / (1 + 10 ** ((red_mean - blue_mean) / RATING_SCALE))
+        surprise = outcome[matches] - expected
+        squared_error += float(np.sum(surprise ** 2))
+
+        k = np.where(played[p] < PROVISIONAL_MATCHES, PROVISIONAL_K_FACTOR, K_FACTOR)
+        # No player repeats within a wave, so plain fancy indexing is safe
+        ratings[p] = current + k * np.where(blue == 1, surprise[local], -surprise[local])
+        played[p] += 1
+
+    rated_matches = len(waves)
+    return RatingReplay(ratings, played, before, squared_error / rated_matches, rated_matches)
+
+
+async def load_history(session: AsyncSession, match_type: str, fill_snapshots: bool = False) -> Tuple:
+    """
+    Completed matches of one type as replay() arrays, plus the player ids by
+    index and, with fill_snapshots, the match_players id of every row that
+    has no rating snapshot (0 for the others).
+    """
+    query = (
+        select(
+            # Only compared to find where a match ends, skip building UUIDs
+            type_coerce(Match.id, String),
+            Match.blue_score > Match.red_score,
+            MatchPlayer.player_id,
+            MatchPlayer.color == TeamColor.blue.value,
+            case((MatchPlayer.rating == None, MatchPlayer.id)) if fill_snapshots else null()
+        )
+        .join(MatchPlayer, MatchPlayer.match_id == Match.id)
+        .filter(
+            Match.match_type == match_type,
+            Match.blue_score != None,
+            Match.red_score != None
+        )
+        # Replayed in the order the matches were played: created_at is the
+        # played_at of imports, updated_at only says when a row was written
+        .order_by(Match.created_at, Match.id)
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+
+    match_index, player_ids, is_blue, blue_won, snapshot_ids = [], [], [], [], []
+    current_match, count = None, -1
+
+    result = await session.stream(query)
+    async for rows in result.partitions():
+        for match_id, won, player_id, blue, snapshot_id in rows:
+            if match_id != current_match:
+                current_match = match_id
+                count += 1
+                blue_won.append(won)
+            match_index.append(count)
+            player_ids.append(player_id)
+            is_blue.append(blue)
+            snapshot_ids.append(snapshot_id or 0)
+
+    ids, player_index = np.unique(np.array(player_ids, dtype=np.int64), return_inverse=True)
+    return (
+        np.array(match_index, dtype=np.int64),
+        player_index.astype(np.int64),
+        np.array(is_blue, dtype=bool),
+        np.array(blue_won, dtype=bool),
+        ids,
+        np.array(snapshot_ids, dtype=np.int64),
+    )
+
+
+async def rebuild_ratings(
+    session: AsyncSession,
+    match_types: Optional[Iterable[str]] = None,
+    fill_snapshots: bool = False
+) -> Dict[str, RatingReplay]:
+    """
+    Replace player_ratings for the given match types (all by default) with a
+    replay of their full history. Runs in the caller's transaction. With
+    fill_snapshots, match players without a rating snapshot (imported or
+    generated rows) get the rating the player had going into the match.
+    """
+    reports = {}
+    for match_type in match_types or [match_type.value for match_type in MatchType]:
+        match_index, player_index, is_blue, blue_won, ids, snapshot_ids = await load_history(
+            session, match_type, fill_snapshots
+        )
+        report = replay(match_index, player_index, is_blue, blue_won, len(ids))
+
+        missing = np.flatnonzero(snapshot_ids)
+        for start in range(0, len(missing), WRITE_BATCH):
+            rows = missing[start:start + WRITE_BATCH]
+            await write_snapshots(session, "rating", [
+                {"b_id": snapshot_id, "b_value": rating}
+                for snapshot_id, rating in zip(snapshot_ids[rows].tolist(), report.before[rows].tolist())
+            ])
+
+        rows: List[Dict] = [
+            {"player_id": player_id, "match_type": match_type, "rating": rating, "matches": matches}
+            for player_id, rating, matches in zip(
+                ids.tolist(), report.ratings.tolist(), report.matches.tolist()
+            )
+        ]
+        await session.execute(delete(PlayerRating).filter(PlayerRating.match_type == match_type))
+        await bulk_insert(session, PlayerRating, rows)
+
+        reports[match_type] = report
+
+    return reports
@@ -0,0 +1,51 @@
+from typing import List, Sequence, Tuple
+
+
+# Elo ratings per player and match type. A team plays at the mean rating of
+# its players, every player of a team moves by their own K times the team's
+# surprise, so a match costs O(team size) to score and to predict.
+
+INITIAL_RATING = 1500.0
+
+# Rating difference at which the stronger team is expected to win 10:1
+RATING_SCALE = 400.0
+
+K_FACTOR = 24.0
+
+# New players move twice as fast until their rating has settled
+PROVISIONAL_MATCHES = 10
+PROVISIONAL_K_FACTOR = 2 * K_FACTOR
+
+
+def team_rating(ratings: Sequence[float]) -> float:
+    return sum(ratings) / len(ratings)
+
+
+def expected_score(blue_rating: float, red_rating: float) -> float:
+    """Probability that blue beats red."""
+    return 1 / (1 + 10 ** ((red_rating - blue_rating) / RATING_SCALE))
+
+
+def k_factor(matches: int) -> float:
+    return PROVISIONAL_K_FACTOR if matches < PROVISIONAL_MATCHES else K_FACTOR
+
+
+def rating_changes(
+    blue: Sequence[Tuple[float, int]],
+    red: Sequence[Tuple[float, int]],
+    blue_won: bool
+) -> Tuple[List[float], List[float]]:
+    """
+    Rating deltas for the players of both teams, each given as (rating,
+    rated matches played so far), in the order they were passed.
+    """
+    expected = expected_score(
+        team_rating([rating for rating, _ in blue]),
+        team_rating([rating for rating, _ in red])
+    )
+    surprise = (1.0 if blue_won else 0.0) - expected
+
+    return (
+        [k_factor(matches) * surprise for _, matches in blue],
+        [-k_factor(matches) * surprise for _, matches in red],
+    )
@@ -0,0 +1,242 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, distinct, null, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.models.models import Match, MatchPlayer, PlayerStats
+from app.models.schemas import MatchType, TeamColor
+from app.utils.leaderboard import lock_partition, rebuild_leaderboard
+from app.utils.match_import import write_snapshots
+from app.utils.misc_functions import _insert_for, bump_versions
+
+
+STAT_FIELDS = ("wins", "losses", "otl", "streak", "longest_streak", "scored", "conceded")
+
+# Rows pulled from the server-side cursor per round trip
+STREAM_BATCH = 10_000
+
+# Rows per bulk upsert when writing the result back
+WRITE_BATCH = 1_000
+
+
+def apply_result(stats: Dict, won: bool, is_overtime: bool, scored: int, conceded: int):
+    # Same rules as upsert_player_stats, one player and one match at a time
+    if won:
+        stats["wins"] += 1
+        stats["streak"] += 1
+        if stats["streak"] > stats["longest_streak"]:
+            stats["longest_streak"] = stats["streak"]
+    elif is_overtime:
+        stats["otl"] += 1
+        stats["streak"] = 0
+    else:
+        stats["losses"] += 1
+        stats["streak"] = 0
+
+    stats["scored"] += scored
+    stats["conceded"] += conceded
+
+
+async def replay_stats(
+    conn: AsyncConnection,
+    match_type: str,
+    season: int,
+    fill_snapshots: bool = False
+) -> List[Dict]:
+    """
+    Recompute PlayerStats rows for one (match_type, season) from its match
+    history. With fill_snapshots, match players without an efficiency
+    snapshot (imported rows) get the efficiency the player had going into
+    the match, written back batch by batch as the replay goes.
+    """
+    ot_threshold = 24 if match_type == MatchType.indoor else 20
+    players: Dict[int, Dict] = {}
+    snapshots: List[Dict] = []
+
+    query = (
+        select(
+            Match.blue_score,
+            Match.red_score,
+            MatchPlayer.player_id,
+            MatchPlayer.color,
+            # The row to fill in, if any
+            case((MatchPlayer.efficiency == None, MatchPlayer.id)) if fill_snapshots else null()
+        )
+        .join(MatchPlayer, MatchPlayer.match_id == Match.id)
+        .filter(
+            Match.match_type == match_type,
+            Match.season == season,
+            Match.blue_score != None,
+            Match.red_score != None
+        )
+        .order_by(Match.created_at, Match.id)
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+
+    result = await conn.stream(query)
+    async for rows in result.partitions():
+        for blue_score, red_score, player_id, color, snapshot_id in rows:
+            stats = players.get(player_id)
+            if stats is None:
+                stats = players[player_id] = dict.fromkeys(STAT_FIELDS, 0)
+
+            if snapshot_id is not None:
+                snapshots.append({
+                    "b_id": snapshot_id,
+                    "b_value": stats["scored"] / stats["conceded"] if stats["conceded"] else 0
+                })
+
+            if color == TeamColor.blue:
+                scored, conceded = blue_score, red_score
+            else:
+                scored, conceded = red_score, blue_score
+
+            apply_result(
+                stats,
+                won=scored > conceded,
+                is_overtime=blue_score >= ot_threshold and red_score >= ot_threshold,
+                scored=scored,
+                conceded=conceded
+            )
+
+        # Only rows the cursor has passed are updated, and not their
+        # ordering columns
+        if len(snapshots) >= WRITE_BATCH:
+            await write_snapshots(conn, "efficiency", snapshots)
+            snapshots = []
+
+    await write_snapshots(conn, "efficiency", snapshots)
+
+    return [
+        {"player_id": player_id, "match_type": match_type, "season": season, **stats}
+        for player_id, stats in players.items()
+    ]
+
+
+async def _replay_partition(match_type: str, season: int) -> List[Dict]:
+    # Runs inside a worker process, which gets its own engine on import
+    from app.core.database import engine
+
+    try:
+        async with engine.connect() as conn:
+            return await replay_stats(conn, match_type, season)
+    finally:
+        await engine.dispose()
+
+
+def replay_partition(partition: Tuple[str, int]) -> List[Dict]:
+    # Process pool entry point
+    return asyncio.run(_replay_partition(*partition))
+
+
+async def list_partitions(
+    session: AsyncSession,
+    match_type: Optional[str] = None,
+    season: Optional[int] = None
+) -> List[Tuple[str, int]]:
+    # Partitions that have matches plus the ones that only have stats left
+    partitions = set()
+    for model in (Match, PlayerStats):
+        query = select(distinct(model.match_type), model.season)
+        if match_type is not None:
+            query = query.filter(model.match_type == match_type)
+        if season is not None:
+            query = query.filter(model.season == season)
+
+        response = await session.execute(query)
+        partitions.update((row[0], row[1]) for row in response.all())
+
+    return sorted(partitions)
+
+
+async def lock_partitions(session: AsyncSession, partitions: List[Tuple[str, int]]):
+    # Always in sorted order, so two replays never wait on each other's locks
+    for match_type, season in sorted(partitions):
+        await lock_partition(session, match_type, season)
+
+
+async def write_partition(session: AsyncSession, match_type: str, season: int, rows: List[Dict]):
+    # Players without completed matches keep their row, zeroed
+    await session.execute(
+        update(PlayerStats)
+        .filter(PlayerStats.match_type == match_type, PlayerStats.season == season)
+        .values(**dict.fromkeys(STAT_FIELDS, 0))
+    )
+
+    insert = _insert_for(session)
+    for start in range(0, len(rows), WRITE_BATCH):
+        statement = insert(PlayerStats).values(rows[start:start + WRITE_BATCH])
+        statement = statement.on_conflict_do_update(
+            index_elements=["player_id", "match_type", "season"],
+            set_={field: getattr(statement.excluded, field) for field in STAT_FIELDS}
+        )
+        await session.execute(statement)
+
+
+async def rebuild_player_stats(
+    session: AsyncSession,
+    match_type: Optional[str] = None,
+    season: Optional[int] = None,
+    workers: Optional[int] = None
+) -> List[Tuple[str, int]]:
+    """
+    Replay every completed match in created_at order and overwrite PlayerStats
+    (and the leaderboard) with the result. Partitions are independent, so each
+    (match_type, season) is replayed in its own worker process.
+
+    The workers read outside the session's transaction, so every partition
+    is locked against submissions and imports from before the reads until
+    the write is committed. SQLite has no such lock: run it there while
+    nothing else writes.
+    """
+    partitions = await list_partitions(session, match_type, season)
+    await lock_partitions(session, partitions)
+
+    # spawn, so workers never inherit the parent's pooled connections
+    context = multiprocessing.get_context("spawn")
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        results = await asyncio.gather(*(
+            loop.run_in_executor(pool, replay_partition, partition)
+            for partition in partitions
+        ))
+
+    await write_back(session, partitions, results)
+
+    return partitions
+
+
+async def recompute_partitions(
+    session: AsyncSession,
+    partitions: Iterable[Tuple[str, int]],
+    fill_snapshots: bool = False
+):
+    """
+    Replay the given partitions in process, on the session's own transaction,
+    filling missing efficiency snapshots like replay_stats.
+    """
+    partitions = sorted(partitions)
+    await lock_partitions(session, partitions)
+    conn = await session.connection()
+
+    results = []
+    for match_type, season in partitions:
+        results.append(await replay_stats(conn, match_type, season, fill_snapshots))
+
+    await write_back(session, partitions, results)
+
+
+async def write_back(
+    session: AsyncSession,
+    partitions: List[Tuple[str, int]],
+    results: List[List[Dict]]
+):
+    for (match_type, season), rows in zip(partitions, results):
+        await write_partition(session, match_type, season, rows)
+        await rebuild_leaderboard(session, match_type, season)
+
+    # Efficiencies shown in both listings may have changed
+    await bump_versions(session, "players", "matches")
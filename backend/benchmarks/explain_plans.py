@@ -0,0 +1,175 @@
+"""
+EXPLAIN every query the routers issue and fail on sequential scans.
+
+Seeds the database configured in `.env`, drives the match/player/leaderboard
+endpoints in-process while recording the SQL they send, then EXPLAINs each
+statement with its real parameters. On Postgres `enable_seqscan` is turned
+off for the EXPLAIN, so a Seq Scan in the plan means no index can serve the
+query at all, however small the seeded tables are.
+
+    uv run python -m benchmarks.explain_plans --players 60 --matches 300
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import uuid
+
+import httpx
+from sqlalchemy import event
+
+from main import app
+from app.core.auth import current_active_user
+from app.core.database import Base, create_db_and_tables, engine
+
+
+EXPLAINED = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+def postgres_seq_scans(plan) -> list:
+    scans = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            scans.append(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+
+def sqlite_seq_scans(rows) -> list:
+    # "SCAN players" is a full table scan, "SCAN players USING INDEX ..." is not
+    scans = []
+    for row in rows:
+        detail = row[-1].split()
+        if len(detail) >= 2 and detail[0] == "SCAN" and "USING" not in detail:
+            if detail[1] in Base.metadata.tables:
+                scans.append(detail[1])
+    return scans
+
+
+async def explain(conn, statement: str, parameters) -> list:
+    if conn.dialect.name == "postgresql":
+        result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = result.scalar()
+        return postgres_seq_scans(json.loads(plan) if isinstance(plan, str) else plan)
+
+    result = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+    return sqlite_seq_scans(result.all())
+
+
+async def seed(client: httpx.AsyncClient, rng: random.Random, players: int, matches: int) -> list:
+    prefix = uuid.uuid4().hex[:8]
+    names = [f"explain-{prefix}-{i}" for i in range(players)]
+    for name in names:
+        response = await client.post("/players/create", json={"name": name})
+        response.raise_for_status()
+
+    for i in range(matches):
+        team_size = rng.randint(2, 6)
+        pool = rng.sample(names, 2 * team_size)
+        response = await client.post("/matches/create", json={
+            "match_type": rng.choice(["indoor", "beach"]),
+            "blue_team": pool[:team_size],
+            "red_team": pool[team_size:]
+        })
+        response.raise_for_status()
+
+        # Leave a few drafts behind
+        if i % 10:
+            blue_score, red_score = rng.choice([(25, 20), (20, 25), (26, 24), (21, 19)])
+            response = await client.put(
+                f"/matches/{response.json()['id']}/results",
+                json={"blue_score": blue_score, "red_score": red_score}
+            )
+            response.raise_for_status()
+
+    return names
+
+
+def scenarios(names: list, match_ids: list):
+    # One call per router query shape we care about
+    yield "list_players", "GET", "/players/", None
+    yield "get_player", "GET", f"/players/{names[0]}", None
+    yield "list_player_matches", "GET", f"/players/{names[0]}/matches", {"match_type": "indoor"}
+    yield "list_matches", "GET", "/matches/", {"status": "completed"}
+    yield "list_matches_drafts", "GET", "/matches/", {"status": "draft"}
+    yield "list_matches_page", "GET", "/matches/", {"limit": 20}
+    yield "list_matches_dates", "GET", "/matches/", {"limit": 20, "start_date": "2000-01-01", "end_date": "2100-01-01"}
+    yield "get_match", "GET", f"/matches/{match_ids[0]}", None
+    yield "leaderboard", "GET", "/leaderboard/", {"match_type": "indoor", "limit": 20, "offset": 10}
+    yield "create_match", "POST", "/matches/create", {"match_type": "indoor", "blue_team": names[:3], "red_team": names[3:6]}
+
+
+async def run(args) -> int:
+    rng = random.Random(args.seed)
+    await create_db_and_tables()
+
+    app.dependency_overrides[current_active_user] = lambda: None
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(EXPLAINED):
+            captured.append((statement, parameters))
+
+    failures = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://explain") as client:
+        names = await seed(client, rng, args.players, args.matches)
+
+        response = await client.get("/matches/", params={"limit": 5})
+        match_ids = [match["id"] for match in response.json()["items"]]
+
+        calls = list(scenarios(names, match_ids))
+
+        # Write paths need a fresh draft each
+        response = await client.post("/matches/create", json={
+            "match_type": "indoor", "blue_team": names[:3], "red_team": names[3:6]
+        })
+        calls.append(("submit_match_results", "PUT", f"/matches/{response.json()['id']}/results", {"blue_score": 25, "red_score": 20}))
+        response = await client.post("/matches/create", json={
+            "match_type": "indoor", "blue_team": names[:3], "red_team": names[3:6]
+        })
+        calls.append(("delete_match", "DELETE", f"/matches/{response.json()['id']}", None))
+
+        for name, method, url, payload in calls:
+            captured.clear()
+            event.listen(engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                if method == "GET":
+                    response = await client.get(url, params=payload)
+                else:
+                    response = await client.request(method, url, json=payload)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", capture)
+            response.raise_for_status()
+
+            async with engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    await conn.exec_driver_sql("SET enable_seqscan = off")
+
+                for statement, parameters in captured:
+                    scans = await explain(conn, statement, parameters)
+                    if scans:
+                        failures.append((name, scans, " ".join(statement.split())))
+
+            print(f"{name:<22} {len(captured):>3} statements")
+
+    await engine.dispose()
+
+    for name, scans, statement in failures:
+        print(f"\nSEQ SCAN on {', '.join(scans)} in {name}:\n  {statement[:300]}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=60)
+    parser.add_argument("--matches", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
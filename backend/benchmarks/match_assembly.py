@@ -0,0 +1,108 @@
+"""
+Micro-benchmark of match response assembly for list_matches, no database.
+
+Builds transient Match rows with 12 players each and times turning them into
+MatchResponse objects and serializing those to JSON, as list_matches does.
+
+    uv run python -m benchmarks.match_assembly --sizes 1000 10000
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+
+import app.models.models  # noqa: F401, registers every mapper
+from app.models.models import Match, MatchPlayer, Player
+from app.models.schemas import MatchResponse, PlayerBase
+from app.utils.misc_functions import build_match_responses
+
+
+def make_matches(count: int, players: int = 200, team_size: int = 6) -> List[Match]:
+    rng = random.Random(count)
+    roster = [Player(id=i, name=f"player-{i}") for i in range(players)]
+    start = datetime(2024, 1, 1)
+
+    matches = []
+    for i in range(count):
+        match = Match(
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            match_type=rng.choice(["indoor", "beach"]),
+            season=2024 + i % 3,
+            blue_score=25,
+            red_score=rng.randint(10, 27),
+            created_at=start + timedelta(minutes=i),
+            updated_at=start + timedelta(minutes=i),
+        )
+        for j, player in enumerate(rng.sample(roster, 2 * team_size)):
+            match.players.append(MatchPlayer(
+                player_id=player.id,
+                player=player,
+                color="blue" if j < team_size else "red",
+                efficiency=rng.uniform(0.5, 1.5),
+            ))
+        matches.append(match)
+
+    return matches
+
+
+def build_validated(matches: List[Match]) -> List[MatchResponse]:
+    # Reference: the previous per-match builder, validating every model and
+    # walking match.players once per team
+    responses = []
+    for match in matches:
+        blue_team = [
+            PlayerBase(id=mp.player_id, name=mp.player.name, efficiency=mp.efficiency or 0)
+            for mp in match.players if mp.color == "blue"
+        ]
+        red_team = [
+            PlayerBase(id=mp.player_id, name=mp.player.name, efficiency=mp.efficiency or 0)
+            for mp in match.players if mp.color == "red"
+        ]
+        responses.append(MatchResponse(
+            id=match.id,
+            match_type=match.match_type,
+            season=match.season,
+            blue_team=blue_team,
+            red_team=red_team,
+            blue_score=match.blue_score,
+            red_score=match.red_score,
+            created_at=match.created_at,
+            updated_at=match.updated_at
+        ))
+    return responses
+
+
+def best_of(repeat: int, function) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(sizes: List[int], repeat: int):
+    adapter = TypeAdapter(List[MatchResponse])
+
+    builders = {"validated": build_validated, "batch": build_match_responses}
+
+    print(f"{'matches':>8} {'builder':<10} {'build ms':>10} {'build+json ms':>14}")
+    for size in sizes:
+        matches = make_matches(size)
+        for name, build in builders.items():
+            build_time = best_of(repeat, lambda: build(matches))
+            total_time = best_of(repeat, lambda: adapter.dump_json(build(matches)))
+            print(f"{size:>8} {name:<10} {build_time * 1000:>10.1f} {total_time * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    main(args.sizes, args.repeat)
@@ -0,0 +1,137 @@
+"""
+Default vs orjson serialization of list_matches and list_players, no database.
+
+Before timing, checks that both paths produce byte-identical bodies for the
+same rows, so a drift between the schemas and app.utils.fast_json fails loudly.
+
+    uv run python -m benchmarks.serialization --sizes 1000 10000
+"""
+import argparse
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+
+import app.models.models  # noqa: F401, registers every mapper
+from app.models.models import Match, MatchPlayer, Player, PlayerStats
+from app.models.schemas import MatchResponse, PlayerResponse
+from app.utils.fast_json import FastJSONResponse, match_dicts, player_dicts
+from app.utils.misc_functions import build_match_responses
+
+from benchmarks.match_assembly import best_of, make_matches
+
+
+def make_players(count: int) -> List[Player]:
+    rng = random.Random(count)
+    start = datetime(2024, 1, 1, 12, 30, 15, 250000)
+
+    players = []
+    for i in range(count):
+        player = Player(
+            id=i + 1,
+            name=f"player-{i}",
+            created_at=start + timedelta(seconds=i),
+            updated_at=start + timedelta(seconds=i),
+        )
+        for match_type in ("indoor", "beach"):
+            # Leave some rows empty to cover the zero-division branches
+            wins, losses, otl = (rng.randint(0, 40) for _ in range(3)) if i % 7 else (0, 0, 0)
+            player.stats.append(PlayerStats(
+                match_type=match_type,
+                season=2024,
+                wins=wins,
+                losses=losses,
+                otl=otl,
+                streak=rng.randint(-5, 5),
+                longest_streak=rng.randint(0, 10),
+                scored=rng.randint(0, 2000) if i % 7 else 0,
+                conceded=rng.randint(0, 2000) if i % 7 else 0,
+            ))
+        players.append(player)
+
+    return players
+
+
+def make_edge_matches() -> List[Match]:
+    # Drafts, overtime on both thresholds, zero and tied efficiencies
+    start = datetime(2024, 6, 1)
+    roster = [Player(id=i, name=f"edge-{i}") for i in range(4)]
+    matches = []
+    for i, (match_type, blue, red, effs) in enumerate([
+        ("indoor", None, None, (None, None, None, None)),
+        ("indoor", 26, 24, (1.0, 1.0, 0.5, 2.0)),
+        ("beach", 22, 20, (0.0, 0.0, 0.0, 0.0)),
+        ("beach", 15, 21, (1 / 3, 2 / 3, 1.25, 0.1)),
+    ]):
+        match = Match(
+            id=uuid.UUID(int=i + 1, version=4),
+            match_type=match_type,
+            season=2024,
+            blue_score=blue,
+            red_score=red,
+            created_at=start + timedelta(hours=i, microseconds=i * 1000),
+            updated_at=start + timedelta(hours=i),
+        )
+        for j, player in enumerate(roster):
+            match.players.append(MatchPlayer(
+                player_id=player.id,
+                player=player,
+                color="blue" if j < 2 else "red",
+                efficiency=effs[j],
+            ))
+        matches.append(match)
+    return matches
+
+
+def check_contract(matches: List[Match], players: List[Player]):
+    match_adapter = TypeAdapter(List[MatchResponse])
+    player_adapter = TypeAdapter(List[PlayerResponse])
+
+    expected = match_adapter.dump_json(build_match_responses(matches))
+    actual = FastJSONResponse(match_dicts(matches)).body
+    assert expected == actual, "list_matches bodies differ"
+
+    expected = player_adapter.dump_json(player_adapter.validate_python(players, from_attributes=True))
+    actual = FastJSONResponse(player_dicts(players)).body
+    assert expected == actual, "list_players bodies differ"
+
+
+def main(sizes: List[int], repeat: int):
+    check_contract(make_matches(200) + make_edge_matches(), make_players(200))
+    print("contract: default and fast bodies are byte-identical")
+
+    match_adapter = TypeAdapter(List[MatchResponse])
+    player_adapter = TypeAdapter(List[PlayerResponse])
+
+    print(f"{'rows':>8} {'endpoint':<13} {'default ms':>11} {'fast ms':>9} {'speedup':>8}")
+    for size in sizes:
+        matches = make_matches(size)
+        players = make_players(size)
+        runs = {
+            "list_matches": (
+                lambda: match_adapter.dump_json(build_match_responses(matches)),
+                lambda: FastJSONResponse(match_dicts(matches)).body,
+            ),
+            "list_players": (
+                lambda: player_adapter.dump_json(player_adapter.validate_python(players, from_attributes=True)),
+                lambda: FastJSONResponse(player_dicts(players)).body,
+            ),
+        }
+        for name, (default, fast) in runs.items():
+            default_time = best_of(repeat, default)
+            fast_time = best_of(repeat, fast)
+            print(
+                f"{size:>8} {name:<13} {default_time * 1000:>11.1f} "
+                f"{fast_time * 1000:>9.1f} {default_time / fast_time:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    main(args.sizes, args.repeat)
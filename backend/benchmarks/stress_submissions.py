@@ -0,0 +1,192 @@
+"""
+Fire many concurrent result submissions and check the final counters.
+
+Every draft is submitted several times at once; exactly one submission per
+match must win, every player's wins/losses/otl/scored/conceded must equal
+what the accepted results add up to, and the leaderboard must hold positions
+1..n without gaps or duplicates, in points order. Point it at a local Postgres (the
+docker-compose service) through `.env`, or at running workers with --base-url:
+
+    uv run python -m benchmarks.stress_submissions --matches 200 --duplicates 4
+    uv run uvicorn main:app --workers 4 &
+    uv run python -m benchmarks.stress_submissions --base-url http://localhost:8000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import uuid
+from collections import defaultdict
+
+import httpx
+
+from app.core.config import settings
+
+
+async def authenticate(client: httpx.AsyncClient) -> dict:
+    email = f"stress-{uuid.uuid4().hex[:8]}@example.com"
+    password = uuid.uuid4().hex
+
+    response = await client.post("/auth/register", json={
+        "email": email,
+        "password": password,
+        "registration_code": settings.registration_code
+    })
+    response.raise_for_status()
+
+    response = await client.post("/auth/jwt/login", data={"username": email, "password": password})
+    response.raise_for_status()
+
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+
+    if args.base_url:
+        transport = None
+        base_url = args.base_url
+    else:
+        from main import app
+        from app.core.database import create_db_and_tables
+
+        await create_db_and_tables()
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://stress"
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        headers = await authenticate(client)
+
+        prefix = uuid.uuid4().hex[:8]
+        names = [f"stress-{prefix}-{i}" for i in range(args.players)]
+        for name in names:
+            response = await client.post("/players/create", json={"name": name}, headers=headers)
+            response.raise_for_status()
+
+        # Small pool and big teams so most matches overlap on players
+        drafts = []
+        for _ in range(args.matches):
+            pool = rng.sample(names, 2 * args.team_size)
+            response = await client.post("/matches/create", json={
+                "match_type": "indoor",
+                "blue_team": pool[:args.team_size],
+                "red_team": pool[args.team_size:]
+            }, headers=headers)
+            response.raise_for_status()
+            drafts.append(response.json())
+
+        scores = {
+            draft["id"]: rng.choice([(25, 20), (20, 25), (26, 24), (24, 26), (25, 12)])
+            for draft in drafts
+        }
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def submit(match_id):
+            blue_score, red_score = scores[match_id]
+            async with semaphore:
+                response = await client.put(
+                    f"/matches/{match_id}/results",
+                    json={"blue_score": blue_score, "red_score": red_score},
+                    headers=headers
+                )
+            return match_id, response.status_code
+
+        jobs = [submit(draft["id"]) for draft in drafts for _ in range(args.duplicates)]
+        rng.shuffle(jobs)
+        outcomes = await asyncio.gather(*jobs)
+
+        failures = []
+
+        accepted = defaultdict(int)
+        for match_id, status_code in outcomes:
+            if status_code == 200:
+                accepted[match_id] += 1
+            elif status_code != 400:
+                failures.append(f"match {match_id}: unexpected status {status_code}")
+
+        for draft in drafts:
+            if accepted[draft["id"]] != 1:
+                failures.append(f"match {draft['id']}: accepted {accepted[draft['id']]} times")
+
+        expected = defaultdict(lambda: defaultdict(int))
+        for draft in drafts:
+            blue_score, red_score = scores[draft["id"]]
+            is_overtime = blue_score >= 24 and red_score >= 24
+            for color, team, own, opp in (
+                ("blue", draft["blue_team"], blue_score, red_score),
+                ("red", draft["red_team"], red_score, blue_score),
+            ):
+                for player in team:
+                    counters = expected[player["name"]]
+                    if own > opp:
+                        counters["wins"] += 1
+                    elif is_overtime:
+                        counters["otl"] += 1
+                    else:
+                        counters["losses"] += 1
+                    counters["scored"] += own
+                    counters["conceded"] += opp
+
+        for name in names:
+            response = await client.get(f"/players/{name}")
+            response.raise_for_status()
+            stats = next(s for s in response.json()["stats"] if s["match_type"] == "indoor")
+
+            for field in ("wins", "losses", "otl", "scored", "conceded"):
+                if stats[field] != expected[name][field]:
+                    failures.append(f"{name}: {field} is {stats[field]}, expected {expected[name][field]}")
+
+            if not stats["streak"] <= stats["longest_streak"] <= stats["wins"]:
+                failures.append(f"{name}: inconsistent streaks {stats['streak']}/{stats['longest_streak']}")
+
+        # Concurrent re-ranks of one partition must not interleave
+        season = drafts[0]["season"]
+        entries, offset = [], 0
+        while True:
+            response = await client.get("/leaderboard/", params={
+                "match_type": "indoor", "season": season, "limit": 500, "offset": offset
+            })
+            response.raise_for_status()
+            page = response.json()
+            entries += page["items"]
+            offset += 500
+            if offset >= page["total"]:
+                break
+
+        positions = [entry["position"] for entry in entries]
+        if positions != list(range(1, len(entries) + 1)):
+            failures.append(f"leaderboard: positions are not 1..{len(entries)}: {positions[:20]}")
+        if entries != sorted(entries, key=lambda entry: (-entry["points"], entry["name"])):
+            failures.append("leaderboard: rows are not in points order")
+
+        for entry in entries:
+            if entry["name"] in expected:
+                counters = expected[entry["name"]]
+                points = 2 * counters["wins"] + counters["otl"]
+                if entry["points"] != points:
+                    failures.append(f"leaderboard: {entry['name']} has {entry['points']} points, expected {points}")
+
+    if not args.base_url:
+        from app.core.database import engine
+        await engine.dispose()
+
+    print(f"{len(outcomes)} submissions for {len(drafts)} matches, {len(failures)} failures")
+    for failure in failures[:20]:
+        print(f"  {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", help="Hit running workers instead of the in-process app")
+    parser.add_argument("--players", type=int, default=16)
+    parser.add_argument("--team-size", type=int, default=6)
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--duplicates", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
@@ -0,0 +1,74 @@
+"""
+Count the SQL round trips issued by one `PUT /matches/{id}/results`.
+
+Runs against the database configured in `.env` (tables are created if needed):
+
+    uv run python -m benchmarks.submit_round_trips --players 12
+"""
+import argparse
+import asyncio
+import uuid
+
+import httpx
+from sqlalchemy import event
+
+from main import app
+from app.core.auth import current_active_user
+from app.core.database import create_db_and_tables, engine
+
+
+async def run(players: int, repeat: int):
+    await create_db_and_tables()
+
+    # Auth is not what is being measured here
+    app.dependency_overrides[current_active_user] = lambda: None
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        prefix = uuid.uuid4().hex[:8]
+        names = [f"bench-{prefix}-{i}" for i in range(players)]
+        for name in names:
+            response = await client.post("/players/create", json={"name": name})
+            response.raise_for_status()
+
+        half = players // 2
+        totals = []
+        for _ in range(repeat):
+            response = await client.post("/matches/create", json={
+                "match_type": "indoor",
+                "blue_team": names[:half],
+                "red_team": names[half:]
+            })
+            response.raise_for_status()
+            match_id = response.json()["id"]
+
+            statements.clear()
+            event.listen(engine.sync_engine, "before_cursor_execute", count)
+            try:
+                response = await client.put(
+                    f"/matches/{match_id}/results",
+                    json={"blue_score": 25, "red_score": 21}
+                )
+                response.raise_for_status()
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", count)
+            totals.append(len(statements))
+
+    await engine.dispose()
+
+    print(f"players per match:       {players}")
+    print(f"statements per submit:   {max(totals)} (min {min(totals)}, over {repeat} submissions)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.players, args.repeat))
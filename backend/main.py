@@ -1,20 +1,69 @@
-from fastapi import FastAPI
+import time
+# Taken before any other import, so the import phase covers the whole app
+IMPORT_STARTED = time.perf_counter()
+
+import logging
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from contextlib import asynccontextmanager
 
 from app.core.auth import auth_backend, fastapi_users
 from app.core.database import Base
-from app.core.database import create_db_and_tables, get_async_session
-from app.routers import players, matches, register
+from app.core.database import (
+    check_db_revision, create_db_and_tables, engine, get_async_session, get_pool_status, warm_up_pool
+)
+from app.routers import players, matches, register, leaderboard, export, ratings
 from app.models.schemas import UserCreate, UserRead, UserUpdate
 
 from app.core.config import settings
+from app.core.cache import match_cache
+from app.core.metrics import STARTUP_SECONDS, MetricsMiddleware, instrument_engine, registry
+from app.core import query_count
+
+
+logger = logging.getLogger("uvicorn.error")
+
+# Seconds per startup phase, also exported as app_startup_duration_seconds
+startup_timings = {}
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await create_db_and_tables()
+    phase_started = time.perf_counter()
+
+    def phase_done(phase: str):
+        nonlocal phase_started
+        now = time.perf_counter()
+        startup_timings[phase] = now - phase_started
+        phase_started = now
+
+    async with engine.connect():
+        pass
+    phase_done("first_connection")
+
+    # With many workers starting at once, "check" avoids racing create_all
+    if settings.db_startup == "check":
+        await check_db_revision()
+    elif settings.db_startup == "create_all":
+        await create_db_and_tables()
+    phase_done("schema")
+
+    await warm_up_pool()
+    phase_done("warmup")
+
+    startup_timings["total"] = time.perf_counter() - IMPORT_STARTED
+    for phase, seconds in startup_timings.items():
+        STARTUP_SECONDS.labels(phase).set(seconds)
+    logger.info(
+        "Startup (%s schema): %s",
+        settings.db_startup,
+        ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in startup_timings.items())
+    )
+
     yield
 
 
@@ -25,6 +74,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+instrument_engine(engine)
+query_count.instrument_engine(engine)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[settings.frontend_url],
@@ -33,6 +85,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.environment == "development":
+    app.add_middleware(query_count.QueryCountMiddleware)
+
+# Added last so it wraps everything else
+app.add_middleware(MetricsMiddleware)
+
 
 # Auth routes
 app.include_router(
@@ -61,8 +119,49 @@ app.include_router(register.router)
 # Include routers
 app.include_router(players.router)
 app.include_router(matches.router)
+app.include_router(leaderboard.router)
+app.include_router(export.router)
+app.include_router(ratings.router)
 
 
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/cache")
+def cache_stats():
+    return {"matches": match_cache.stats()}
+
+
+@app.get("/health/pool")
+def pool_stats():
+    return get_pool_status()
+
+
+@app.get("/health/deep")
+async def deep_health_check(session: AsyncSession = Depends(get_async_session)):
+    # Round trip to the database through the pool, as a request would
+    start = time.perf_counter()
+    try:
+        await session.execute(text("SELECT 1"))
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unhealthy", "database": {"ok": False, "error": str(e)}}
+        )
+
+    return {
+        "status": "healthy",
+        "database": {"ok": True, "latency_ms": (time.perf_counter() - start) * 1000},
+        "pool": get_pool_status(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+# Everything above runs when the module is imported
+startup_timings["import"] = time.perf_counter() - IMPORT_STARTED
@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app.core.database import async_session_maker, create_db_and_tables, engine
+from app.utils.leaderboard import rebuild_leaderboard
+from app.utils.league_generator import DEFAULT_UNTIL, generate_league
+from app.utils.rating_replay import rebuild_ratings
+from app.utils.replay import rebuild_player_stats
+
+
+async def run_init_db(args):
+    from alembic import command
+    from alembic.config import Config
+
+    await create_db_and_tables()
+    # env.py runs its own event loop, so stamp from a thread without one
+    config = Config(str(Path(__file__).resolve().parent / "alembic.ini"))
+    await asyncio.to_thread(command.stamp, config, "head")
+
+    print("Tables created and stamped with the current Alembic revision.")
+
+
+async def run_rebuild_leaderboard(args):
+    async with async_session_maker() as session:
+        await rebuild_leaderboard(session, args.match_type, args.season)
+        await session.commit()
+
+    print("Leaderboard rebuilt.")
+
+
+async def run_rebuild_stats(args):
+    async with async_session_maker() as session:
+        partitions = await rebuild_player_stats(session, args.match_type, args.season, args.workers)
+        await session.commit()
+
+    print(f"Player stats rebuilt for {len(partitions)} partitions.")
+
+
+async def run_rebuild_ratings(args):
+    start = time.perf_counter()
+    async with async_session_maker() as session:
+        reports = await rebuild_ratings(session, [args.match_type] if args.match_type else None)
+        await session.commit()
+
+    elapsed = time.perf_counter() - start
+    for match_type, report in reports.items():
+        print(
+            f"{match_type}: {len(report.ratings)} players rated over {report.rated_matches} matches, "
+            f"Brier score {report.brier:.4f}"
+        )
+    print(f"Ratings rebuilt in {elapsed:.1f}s.")
+
+
+async def run_generate_league(args):
+    start = time.perf_counter()
+    async with async_session_maker() as session:
+        report = await generate_league(
+            session, args.players, args.matches, args.seasons, args.seed, args.prefix, args.until
+        )
+        await session.commit()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Generated {report.players} players and {report.matches} matches "
+        f"({report.overtime / max(report.matches, 1):.1%} overtime) over "
+        f"{len(report.partitions)} partitions in {elapsed:.1f}s."
+    )
+
+
+async def main(args):
+    try:
+        await args.func(args)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Volleyball Tracker maintenance commands")
+    commands = parser.add_subparsers(required=True)
+
+    init_db = commands.add_parser("init-db", help="Create every table on an empty database and stamp the Alembic head")
+    init_db.set_defaults(func=run_init_db)
+
+    rebuild = commands.add_parser("rebuild-leaderboard", help="Recompute the leaderboard table from player_stats")
+    rebuild.add_argument("--match-type", choices=["indoor", "beach"])
+    rebuild.add_argument("--season", type=int)
+    rebuild.set_defaults(func=run_rebuild_leaderboard)
+
+    rebuild_stats = commands.add_parser("rebuild-stats", help="Replay match history into player_stats and the leaderboard, holding off submissions to the partitions being replayed (on SQLite, run it while nothing else writes)")
+    rebuild_stats.add_argument("--match-type", choices=["indoor", "beach"])
+    rebuild_stats.add_argument("--season", type=int)
+    rebuild_stats.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    rebuild_stats.set_defaults(func=run_rebuild_stats)
+
+    ratings = commands.add_parser("rebuild-ratings", help="Replay match history into player_ratings")
+    ratings.add_argument("--match-type", choices=["indoor", "beach"])
+    ratings.set_defaults(func=run_rebuild_ratings)
+
+    generate = commands.add_parser("generate-league", help="Bulk insert a synthetic league for scale testing")
+    generate.add_argument("--players", type=int, default=2000)
+    generate.add_argument("--matches", type=int, default=100_000)
+    generate.add_argument("--seasons", type=int, default=3)
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--prefix", default="gen", help="Player names are <prefix>-<number>")
+    generate.add_argument(
+        "--until", type=datetime.fromisoformat, default=DEFAULT_UNTIL,
+        help=f"End of the generated history, ISO date (default: {DEFAULT_UNTIL.date()})"
+    )
+    generate.set_defaults(func=run_generate_league)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,137 @@
+import os
+
+# Settings are read on import, so the environment must be set before the app
+# is. The suite runs against in-memory SQLite unless TEST_DATABASE_URL points
+# it at a scratch database (e.g. the docker-compose Postgres).
+os.environ["ENVIRONMENT"] = "testing"
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-long-enough-for-hs256")
+os.environ.setdefault("REGISTRATION_CODE", "test-registration-code")
+os.environ.setdefault("FRONTEND_URL", "http://testserver")
+
+import uuid
+from typing import Dict, List
+
+import httpx
+import pytest
+from fastapi_users.password import PasswordHelper
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from main import app
+from app.core.auth import get_jwt_strategy
+from app.core.cache import match_cache, user_cache
+from app.core.database import Base, engine, get_async_session
+from app.models.models import User
+
+TEST_EMAIL = "tester@example.com"
+TEST_PASSWORD = "password"
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def connection():
+    """
+    One connection per test with an outer transaction that is rolled back at
+    the end, so every test starts from empty tables. Request sessions join it
+    through savepoints, their commits and rollbacks stay inside the test.
+    """
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            yield conn
+        finally:
+            await transaction.rollback()
+
+
+@pytest.fixture
+async def client(connection):
+    async def get_test_session():
+        # A fresh session per request, like the real dependency
+        async with AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint"
+        ) as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = get_test_session
+    match_cache.clear()
+    user_cache.clear()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        yield client
+
+    app.dependency_overrides.clear()
+    match_cache.clear()
+    user_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def hashed_password() -> str:
+    # Hashing is deliberately slow, so do it once for the whole run
+    return PasswordHelper().hash(TEST_PASSWORD)
+
+
+@pytest.fixture
+async def user(connection, hashed_password) -> User:
+    user = User(id=uuid.uuid4(), email=TEST_EMAIL, hashed_password=hashed_password)
+    async with AsyncSession(
+        bind=connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint"
+    ) as session:
+        session.add(user)
+        await session.commit()
+    return user
+
+
+@pytest.fixture
+async def auth_headers(client, user) -> Dict[str, str]:
+    token = await get_jwt_strategy().write_token(user)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def players(client, auth_headers) -> List[str]:
+    names = [f"player-{i}" for i in range(8)]
+    for name in names:
+        response = await client.post("/players/create", json={"name": name}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+    return names
+
+
+@pytest.fixture
+def create_match(client, auth_headers):
+    async def create(blue_team: List[str], red_team: List[str], match_type: str = "indoor") -> Dict:
+        response = await client.post("/matches/create", headers=auth_headers, json={
+            "match_type": match_type,
+            "blue_team": blue_team,
+            "red_team": red_team
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return create
+
+
+@pytest.fixture
+def submit_results(client, auth_headers):
+    async def submit(match_id: str, blue_score: int, red_score: int) -> Dict:
+        response = await client.put(f"/matches/{match_id}/results", headers=auth_headers, json={
+            "blue_score": blue_score,
+            "red_score": red_score
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return submit
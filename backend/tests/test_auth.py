@@ -0,0 +1,69 @@
+import time
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.query_count import count_statements
+from app.models.models import User
+
+
+async def test_register_and_login(client):
+    response = await client.post("/auth/register", json={
+        "email": "new@example.com",
+        "password": "secret",
+        "registration_code": settings.registration_code
+    })
+    assert response.status_code == 200, response.text
+
+    response = await client.post("/auth/jwt/login", data={"username": "new@example.com", "password": "secret"})
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "new@example.com"
+
+
+async def test_register_needs_code(client):
+    response = await client.post("/auth/register", json={
+        "email": "new@example.com",
+        "password": "secret",
+        "registration_code": "wrong"
+    })
+    assert response.status_code == 403
+
+
+async def test_invalid_token(client):
+    response = await client.get("/auth/me", headers={"Authorization": "Bearer nonsense"})
+    assert response.status_code == 401
+
+
+async def test_user_lookup_is_cached(client, auth_headers):
+    with count_statements() as first:
+        assert (await client.get("/auth/me", headers=auth_headers)).status_code == 200
+    with count_statements() as second:
+        assert (await client.get("/auth/me", headers=auth_headers)).status_code == 200
+
+    assert first.count == 1
+    assert second.count == 0
+
+
+async def test_user_update_invalidates_cache(client, user, auth_headers):
+    assert (await client.get("/auth/me", headers=auth_headers)).json()["email"] == user.email
+
+    response = await client.patch("/auth/me", headers=auth_headers, json={"email": "renamed@example.com"})
+    assert response.status_code == 200
+
+    assert (await client.get("/auth/me", headers=auth_headers)).json()["email"] == "renamed@example.com"
+
+
+async def test_cached_user_expires(client, connection, user, auth_headers, monkeypatch):
+    assert (await client.get("/auth/me", headers=auth_headers)).status_code == 200
+
+    # Deactivated behind this process' back, e.g. through another worker
+    await connection.execute(update(User).where(User.id == user.id).values(is_active=False))
+    assert (await client.get("/auth/me", headers=auth_headers)).status_code == 200
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + settings.auth_cache_ttl + 1)
+    assert (await client.get("/auth/me", headers=auth_headers)).status_code == 401
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+from app.routers import export
+
+
+async def test_export_matches_ndjson(client, players, create_match, submit_results, monkeypatch):
+    # One record per chunk, so records are split across many chunks
+    monkeypatch.setattr(export, "CHUNK_SIZE", 1)
+
+    indoor = await create_match(players[:2], players[2:4])
+    await submit_results(indoor["id"], 25, 20)
+    beach = await create_match(players[4:6], players[6:], match_type="beach")
+    await submit_results(beach["id"], 15, 21)
+    await create_match(players[:2], players[4:6])
+
+    response = await client.get("/export/matches")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+
+    # Drafts are not exported, completed matches come in played order
+    assert [record["id"] for record in records] == [indoor["id"], beach["id"]]
+    assert records[0]["blue_team"] == players[:2]
+    assert records[0]["red_team"] == players[2:4]
+    assert (records[1]["blue_score"], records[1]["red_score"]) == (15, 21)
+
+    response = await client.get("/export/matches", params={"match_type": "beach"})
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [beach["id"]]
+
+
+async def test_export_matches_csv(client, players, create_match, submit_results):
+    match = await create_match(players[:3], players[3:6])
+    await submit_results(match["id"], 26, 24)
+
+    response = await client.get("/export/matches", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == "attachment; filename=matches.csv"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert len(rows) == 1
+    assert rows[0]["blue_team"] == ";".join(players[:3])
+    assert rows[0]["red_team"] == ";".join(players[3:6])
+    assert (rows[0]["blue_score"], rows[0]["red_score"]) == ("26", "24")
+
+
+async def test_export_player_stats(client, players, create_match, submit_results):
+    match = await create_match(players[:2], players[2:4])
+    await submit_results(match["id"], 25, 20)
+
+    response = await client.get("/export/player_stats", params={"match_type": "indoor", "season": match["season"]})
+    assert response.status_code == 200
+    stats = {record["player"]: record for record in map(json.loads, response.text.splitlines())}
+
+    # Every player has a row for the season, only the ones who played count
+    assert set(stats) == set(players)
+    assert (stats[players[0]]["wins"], stats[players[0]]["scored"]) == (1, 25)
+    assert (stats[players[2]]["losses"], stats[players[2]]["conceded"]) == (1, 25)
+    assert stats[players[7]]["wins"] == stats[players[7]]["losses"] == 0
+
+
+async def test_export_rejects_unknown_format(client):
+    for path in ("/export/matches", "/export/player_stats"):
+        response = await client.get(path, params={"format": "xml"})
+        assert response.status_code == 400
@@ -0,0 +1,72 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.leaderboard import rebuild_leaderboard
+
+
+async def test_leaderboard_order(client, players, create_match, submit_results):
+    # players[0] and [1] win twice, [4] and [5] win once, [2] and [3] never
+    for blue, red, blue_score in (
+        (players[:2], players[2:4], 25),
+        (players[:2], players[4:6], 25),
+        (players[4:6], players[2:4], 25),
+    ):
+        match = await create_match(blue, red)
+        await submit_results(match["id"], blue_score, 15)
+
+    response = await client.get("/leaderboard/", params={"match_type": "indoor"})
+    assert response.status_code == 200
+    page = response.json()
+    entries = {entry["name"]: entry for entry in page["items"]}
+
+    assert [entry["position"] for entry in page["items"]] == list(range(1, page["total"] + 1))
+    assert entries[players[0]]["position"] < entries[players[4]]["position"] < entries[players[2]]["position"]
+    assert entries[players[0]]["points"] == 4
+    assert entries[players[2]]["played"] == 2
+
+
+async def test_leaderboard_pages(client, players, create_match, submit_results):
+    match = await create_match(players[:4], players[4:])
+    await submit_results(match["id"], 25, 20)
+
+    first = (await client.get("/leaderboard/", params={"limit": 3})).json()
+    rest = (await client.get("/leaderboard/", params={"limit": 10, "offset": 3})).json()
+    assert first["total"] == rest["total"] == len(players)
+    assert len(first["items"]) + len(rest["items"]) == len(players)
+
+    past_the_end = (await client.get("/leaderboard/", params={"offset": 100})).json()
+    assert past_the_end == {"items": [], "total": len(players)}
+
+
+async def test_refresh_matches_rebuild(client, connection, auth_headers, create_match, submit_results):
+    # Names that sort differently by code point and by a locale's collation,
+    # with ties on points all along
+    names = ["alice", "Bob", "carol", "Dave", "erin", "Frank"]
+    for name in names:
+        response = await client.post("/players/create", json={"name": name}, headers=auth_headers)
+        assert response.status_code == 200
+
+    for blue, red in (
+        (["alice", "Bob"], ["carol", "Dave"]),
+        (["carol", "Dave"], ["erin", "Frank"]),
+        (["Frank"], ["alice"]),
+        (["erin"], ["Bob"]),
+        (["Dave", "alice"], ["Bob", "carol"]),
+    ):
+        match = await create_match(blue, red)
+        await submit_results(match["id"], 25, 20)
+
+    async def standings():
+        page = (await client.get("/leaderboard/", params={"match_type": "indoor"})).json()
+        return [(entry["position"], entry["name"], entry["points"]) for entry in page["items"]]
+
+    refreshed = await standings()
+    async with AsyncSession(bind=connection, join_transaction_mode="create_savepoint") as session:
+        await rebuild_leaderboard(session)
+        await session.commit()
+
+    assert refreshed == await standings()
+    assert [position for position, _, _ in refreshed] == list(range(1, len(names) + 1))
+    # Ties are broken by code point, upper case first
+    assert [(name, points) for _, name, points in refreshed] == [
+        ("Dave", 4), ("alice", 4), ("Bob", 2), ("Frank", 2), ("carol", 2), ("erin", 2)
+    ]
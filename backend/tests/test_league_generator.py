@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Match, MatchPlayer, Player, PlayerStats
+from app.utils.league_generator import generate_league
+from app.utils.replay import STAT_FIELDS, list_partitions, recompute_partitions
+
+UNTIL = datetime(2024, 9, 1)
+
+
+async def generated_rows(session: AsyncSession):
+    matches = (await session.execute(
+        select(Match.id, Match.match_type, Match.season, Match.blue_score, Match.red_score, Match.created_at)
+        .order_by(Match.created_at, Match.id)
+    )).all()
+    match_players = (await session.execute(
+        select(MatchPlayer.match_id, Player.name, MatchPlayer.color, MatchPlayer.efficiency, MatchPlayer.rating)
+        .join(Player, Player.id == MatchPlayer.player_id)
+        .order_by(MatchPlayer.match_id, Player.name)
+    )).all()
+    return matches, match_players
+
+
+async def player_stats(session: AsyncSession):
+    response = await session.execute(
+        select(Player.name, PlayerStats).join(PlayerStats.player)
+    )
+    return {
+        (name, stats.match_type, stats.season): {field: getattr(stats, field) for field in STAT_FIELDS}
+        for name, stats in response.all()
+    }
+
+
+async def test_same_arguments_same_league(connection):
+    runs = []
+    for _ in range(2):
+        async with AsyncSession(bind=connection, join_transaction_mode="create_savepoint") as session:
+            report = await generate_league(session, players=30, matches=300, seasons=2, seed=7, until=UNTIL)
+            runs.append((report, await generated_rows(session)))
+            # Leave the database empty for the second run
+            await session.rollback()
+
+    (first, first_rows), (second, second_rows) = runs
+    assert first == second
+    assert first_rows == second_rows
+    assert first.matches == len(first_rows[0]) == 300
+    assert first.partitions == [(t, s) for t in ("beach", "indoor") for s in (2023, 2024)]
+    assert max(match.created_at for match in first_rows[0]) < UNTIL
+
+
+async def test_generated_league_survives_a_replay(connection):
+    async with AsyncSession(bind=connection, join_transaction_mode="create_savepoint") as session:
+        await generate_league(session, players=30, matches=300, seasons=2, seed=3, until=UNTIL)
+        await session.commit()
+
+        generated = await player_stats(session)
+        _, match_players = await generated_rows(session)
+
+        await recompute_partitions(session, await list_partitions(session))
+        await session.commit()
+
+        assert await player_stats(session) == generated
+        # Every generated row has both snapshots, so odds come from ratings
+        assert all(row.efficiency is not None and row.rating is not None for row in match_players)
+        _, replayed_players = await generated_rows(session)
+        assert replayed_players == match_players
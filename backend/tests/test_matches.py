@@ -0,0 +1,320 @@
+import json
+import uuid
+
+import pytest
+
+from app.core.cache import match_cache
+from app.core.config import settings
+from app.utils import rating_replay, replay
+from app.utils.ratings import INITIAL_RATING
+from app.utils.team_balance import MAX_BALANCE_PLAYERS
+
+
+async def test_create_match(client, players, create_match):
+    match = await create_match(players[:2], players[2:4])
+    assert match["status"] == "draft"
+    assert [player["name"] for player in match["blue_team"]] == players[:2]
+    assert [player["name"] for player in match["red_team"]] == players[2:4]
+    assert match["blue_odds"] == 0.5
+
+
+async def test_create_match_validation(client, players, auth_headers):
+    async def create(blue_team, red_team):
+        return await client.post("/matches/create", headers=auth_headers, json={
+            "match_type": "indoor", "blue_team": blue_team, "red_team": red_team
+        })
+
+    assert (await create([], players[:1])).status_code == 400
+    assert (await create(players[:2], players[1:3])).status_code == 400
+    response = await create(players[:1], ["nobody"])
+    assert response.status_code == 404
+    assert "nobody" in response.json()["detail"]
+
+
+async def test_submit_results(client, players, create_match, submit_results):
+    match = await create_match(players[:2], players[2:4])
+    result = await submit_results(match["id"], 25, 20)
+    assert result["status"] == "completed"
+    assert result["winner"] == "blue"
+    assert not result["is_overtime"]
+
+    response = await client.get(f"/players/{players[0]}")
+    indoor = next(stats for stats in response.json()["stats"] if stats["match_type"] == "indoor")
+    assert (indoor["wins"], indoor["losses"], indoor["scored"], indoor["conceded"]) == (1, 0, 25, 20)
+
+    response = await client.get(f"/players/{players[2]}")
+    indoor = next(stats for stats in response.json()["stats"] if stats["match_type"] == "indoor")
+    assert (indoor["wins"], indoor["losses"], indoor["streak"]) == (0, 1, 0)
+
+
+async def test_submit_overtime(client, players, create_match, submit_results):
+    match = await create_match(players[:2], players[2:4])
+    result = await submit_results(match["id"], 24, 26)
+    assert result["is_overtime"]
+
+    response = await client.get(f"/players/{players[0]}")
+    indoor = next(stats for stats in response.json()["stats"] if stats["match_type"] == "indoor")
+    assert (indoor["losses"], indoor["otl"], indoor["points"]) == (0, 1, 1)
+
+
+async def test_submit_twice(client, players, create_match, submit_results, auth_headers):
+    match = await create_match(players[:2], players[2:4])
+    await submit_results(match["id"], 25, 20)
+
+    response = await client.put(
+        f"/matches/{match['id']}/results", headers=auth_headers, json={"blue_score": 20, "red_score": 25}
+    )
+    assert response.status_code == 400
+
+    response = await client.put(
+        f"/matches/{uuid.uuid4()}/results", headers=auth_headers, json={"blue_score": 20, "red_score": 25}
+    )
+    assert response.status_code == 404
+
+
+async def test_get_match(client, players, create_match):
+    match = await create_match(players[:2], players[2:4], match_type="beach")
+    response = await client.get(f"/matches/{match['id']}")
+    assert response.status_code == 200
+    assert response.json() == match
+
+    response = await client.get(f"/matches/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+
+async def test_delete_match(client, players, create_match, submit_results):
+    draft = await create_match(players[:2], players[2:4])
+    response = await client.delete(f"/matches/{draft['id']}")
+    assert response.status_code == 200
+    assert (await client.get(f"/matches/{draft['id']}")).status_code == 404
+    assert (await client.delete(f"/matches/{draft['id']}")).status_code == 404
+
+    completed = await create_match(players[:2], players[2:4])
+    await submit_results(completed["id"], 25, 20)
+    assert (await client.delete(f"/matches/{completed['id']}")).status_code == 409
+
+
+async def test_list_matches(client, players, create_match, submit_results):
+    ids = []
+    for i in range(5):
+        match = await create_match(players[:2], players[2:4])
+        if i % 2:
+            await submit_results(match["id"], 25, 15)
+        ids.append(match["id"])
+
+    response = await client.get("/matches/")
+    assert [match["id"] for match in response.json()] == ids[::-1]
+
+    response = await client.get("/matches/", params={"status": "completed"})
+    assert [match["id"] for match in response.json()] == [ids[3], ids[1]]
+
+    response = await client.get("/matches/", params={"status": "draft"})
+    assert [match["id"] for match in response.json()] == [ids[4], ids[2], ids[0]]
+
+
+async def test_list_matches_pages(client, players, create_match):
+    for _ in range(5):
+        await create_match(players[:2], players[2:4])
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/matches/", params=params)).json()
+        seen += [match["id"] for match in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    everything = [match["id"] for match in (await client.get("/matches/")).json()]
+    assert seen == everything
+
+    response = await client.get("/matches/", params={"limit": 2, "cursor": "garbage"})
+    assert response.status_code == 400
+
+
+async def test_list_matches_etag(client, players, create_match, submit_results):
+    match = await create_match(players[:2], players[2:4])
+    response = await client.get("/matches/")
+    etag = response.headers["etag"]
+    assert (await client.get("/matches/", headers={"If-None-Match": etag})).status_code == 304
+
+    # The cached list must not outlive the draft it shows
+    await submit_results(match["id"], 25, 20)
+    response = await client.get("/matches/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["status"] == "completed"
+
+
+async def test_match_cache_sees_other_workers(client, players, create_match, submit_results, monkeypatch):
+    match = await create_match(players[:2], players[2:4])
+    assert (await client.get("/matches/")).json()[0]["status"] == "draft"
+    assert (await client.get(f"/matches/{match['id']}")).json()["status"] == "draft"
+
+    # A write through another worker leaves this process' entries in place
+    monkeypatch.setattr(match_cache, "invalidate", lambda *tags: None)
+    await submit_results(match["id"], 25, 20)
+
+    assert (await client.get("/matches/")).json()[0]["status"] == "completed"
+    assert (await client.get(f"/matches/{match['id']}")).json()["status"] == "completed"
+
+
+async def test_fast_json_matches_default(client, players, create_match, submit_results, monkeypatch):
+    for i in range(3):
+        match = await create_match(players[:3], players[3:6], match_type="beach" if i else "indoor")
+        await submit_results(match["id"], 21 + i, 19)
+    await create_match(players[:2], players[6:])
+
+    bodies = {}
+    for fast_json in (False, True):
+        monkeypatch.setattr(settings, "fast_json", fast_json)
+        # The cache holds whichever representation was built, as the flag
+        # never changes while a process runs
+        match_cache.clear()
+        bodies[fast_json] = [
+            (await client.get(path)).content
+            for path in ("/matches/", "/matches/?limit=2", "/players/")
+        ]
+
+    assert bodies[True] == bodies[False]
+
+
+async def test_import_matches(client, players, auth_headers):
+    lines = [
+        {"match_type": "indoor", "blue_team": players[:2], "red_team": players[2:4],
+         "blue_score": 25, "red_score": 18},
+        {"match_type": "beach", "blue_team": players[:2], "red_team": ["nobody"],
+         "blue_score": 21, "red_score": 10},
+    ]
+    response = await client.post(
+        "/matches/import",
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+        content="\n".join(json.dumps(line) for line in lines),
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["failed"]) == (1, 1)
+    assert result["errors"][0]["line"] == 2
+
+    response = await client.get(f"/players/{players[0]}")
+    indoor = next(stats for stats in response.json()["stats"] if stats["match_type"] == "indoor")
+    assert indoor["wins"] == 1
+
+
+async def test_import_snapshots(client, players, auth_headers, monkeypatch):
+    # Snapshots are written a few rows at a time while the replays stream
+    for module in (replay, rating_replay):
+        monkeypatch.setattr(module, "STREAM_BATCH", 3)
+        monkeypatch.setattr(module, "WRITE_BATCH", 2)
+
+    # The later match comes first, its snapshots include the earlier one
+    lines = [
+        {"match_type": "indoor", "blue_team": players[:2], "red_team": players[2:4],
+         "blue_score": 20, "red_score": 25, "played_at": "2024-03-02T10:00:00"},
+        {"match_type": "indoor", "blue_team": players[:2], "red_team": players[2:4],
+         "blue_score": 25, "red_score": 15, "played_at": "2024-03-01T10:00:00"},
+    ]
+    response = await client.post(
+        "/matches/import",
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+        content="\n".join(json.dumps(line) for line in lines),
+    )
+    assert response.json()["imported"] == 2
+
+    later, earlier = (await client.get("/matches/", params={"match_type": "indoor"})).json()
+    assert earlier["blue_score"] == 25
+    for player in earlier["blue_team"] + earlier["red_team"]:
+        assert (player["efficiency"], player["rating"]) == (0, INITIAL_RATING)
+
+    assert [p["efficiency"] for p in later["blue_team"]] == pytest.approx([25 / 15] * 2)
+    assert [p["efficiency"] for p in later["red_team"]] == pytest.approx([15 / 25] * 2)
+    assert later["blue_team"][0]["rating"] > INITIAL_RATING > later["red_team"][0]["rating"]
+    assert later["blue_odds"] > 0.5
+
+
+async def test_import_reports_malformed_rows(client, players, auth_headers):
+    valid = {"match_type": "indoor", "blue_team": players[:2], "red_team": players[2:4],
+             "blue_score": 25, "red_score": 18}
+    lines = [
+        {**valid, "blue_team": [{"name": players[0]}], "red_team": [players[2]]},
+        {**valid, "red_team": [[players[2]], players[3]]},
+        {**valid, "blue_team": [players[0], ""]},
+        {**valid, "played_at": 1700000000},
+        {**valid, "played_at": "yesterday"},
+        valid,
+    ]
+    response = await client.post(
+        "/matches/import",
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+        content="\n".join(json.dumps(line) for line in lines),
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["failed"]) == (1, 5)
+    assert [error["line"] for error in result["errors"]] == [1, 2, 3, 4, 5]
+    assert "non-empty strings" in result["errors"][0]["error"]
+    assert "played_at" in result["errors"][3]["error"]
+
+
+async def test_import_converts_aware_played_at(client, players, auth_headers):
+    lines = [
+        {"match_type": "indoor", "blue_team": players[:2], "red_team": players[2:4],
+         "blue_score": 25, "red_score": 18, "played_at": played_at}
+        for played_at in ("2025-03-01T10:00:00Z", "2025-03-01T12:30:00+02:00", "2025-03-01T09:00:00")
+    ]
+    response = await client.post(
+        "/matches/import",
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+        content="\n".join(json.dumps(line) for line in lines),
+    )
+    assert response.json()["imported"] == 3
+
+    matches = (await client.get("/matches/")).json()
+    assert [match["created_at"] for match in matches] == [
+        "2025-03-01T10:30:00", "2025-03-01T10:00:00", "2025-03-01T09:00:00"
+    ]
+
+
+async def test_balance(client, players, create_match, submit_results):
+    # Give the players different efficiencies
+    for blue, red, score in ((players[:2], players[2:4], 15), (players[4:6], players[6:], 22)):
+        match = await create_match(blue, red)
+        await submit_results(match["id"], 25, score)
+
+    response = await client.post("/matches/balance", json={"match_type": "indoor", "players": players})
+    assert response.status_code == 200
+    split = response.json()
+    assert len(split["blue_team"]) == len(split["red_team"]) == 4
+    assert {p["name"] for p in split["blue_team"] + split["red_team"]} == set(players)
+    assert abs(split["blue_total"] - split["red_total"]) == pytest.approx(split["gap"])
+    # Each strong player pairs up with a weak one
+    assert split["gap"] == pytest.approx(0)
+    assert split["blue_odds"] == pytest.approx(0.5)
+
+    # The teams are valid input for create_match
+    await create_match([p["name"] for p in split["blue_team"]], [p["name"] for p in split["red_team"]])
+
+
+async def test_balance_top_k(client, players):
+    body = {"match_type": "beach", "players": players[:5], "top_k": 5, "seed": 3}
+    first = (await client.post("/matches/balance", json=body)).json()
+    again = (await client.post("/matches/balance", json=body)).json()
+    assert first == again
+    assert sorted(len(team) for team in (first["blue_team"], first["red_team"])) == [2, 3]
+
+    lineups = set()
+    for seed in range(20):
+        split = (await client.post("/matches/balance", json={**body, "seed": seed})).json()
+        lineups.add(frozenset(p["name"] for p in split["blue_team"]))
+    assert len(lineups) > 1
+
+
+async def test_balance_validation(client, players):
+    async def balance(**body):
+        return await client.post("/matches/balance", json={"match_type": "indoor", **body})
+
+    assert (await balance(players=players[:1])).status_code == 400
+    assert (await balance(players=[players[0], players[0]])).status_code == 400
+    assert (await balance(players=players, top_k=0)).status_code == 400
+    assert (await balance(players=[f"p{i}" for i in range(MAX_BALANCE_PLAYERS + 1)])).status_code == 400
+    response = await balance(players=[players[0], "nobody"])
+    assert response.status_code == 404
@@ -0,0 +1,64 @@
+from app.core.database import get_async_session
+from app.core.metrics import registry
+from main import app
+
+
+def requests_count(route: str, status: str = "200", method: str = "GET") -> float:
+    value = registry.get_sample_value(
+        "http_requests_total", {"method": method, "route": route, "status": status}
+    )
+    return value or 0.0
+
+
+async def test_route_labels_are_templates(client, auth_headers):
+    # A value that equals a literal segment must not be templated too
+    response = await client.post("/players/create", json={"name": "players"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    labels = [
+        ("/players/{name}", "200"),
+        ("/auth/me", "200"),
+        ("/matches/{match_id}", "404"),
+        ("unmatched", "404"),
+    ]
+    before = [requests_count(route, status) for route, status in labels]
+
+    assert (await client.get("/players/players")).status_code == 200
+    assert (await client.get("/auth/me", headers=auth_headers)).status_code == 200
+    assert (await client.get("/matches/00000000-0000-4000-8000-000000000000")).status_code == 404
+    assert (await client.get("/no/such/path")).status_code == 404
+
+    after = [requests_count(route, status) for route, status in labels]
+    assert after == [count + 1 for count in before]
+
+    assert requests_count("/{name}/{name}") == 0
+    assert requests_count("/me") == 0
+
+    exposition = (await client.get("/metrics")).text
+    assert 'route="/players/{name}"' in exposition
+    assert 'db_pool_saturation' in exposition
+
+
+async def test_deep_health(client):
+    response = await client.get("/health/deep")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "healthy"
+    assert body["database"]["ok"] is True
+    assert {"size", "checked_out", "saturation"} <= set(body["pool"])
+
+
+async def test_deep_health_reports_database_errors(client):
+    class BrokenSession:
+        async def execute(self, statement):
+            raise ConnectionError("database is down")
+
+    working = app.dependency_overrides[get_async_session]
+    app.dependency_overrides[get_async_session] = BrokenSession
+    try:
+        response = await client.get("/health/deep")
+    finally:
+        app.dependency_overrides[get_async_session] = working
+
+    assert response.status_code == 503
+    assert response.json()["database"] == {"ok": False, "error": "database is down"}
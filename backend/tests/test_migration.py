@@ -0,0 +1,152 @@
+import os
+import subprocess
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+from app.core.database import Base, alembic_heads, engine
+from app.utils.ratings import INITIAL_RATING
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+# The schema create_all made before the first migration, frozen here like the
+# migrations freeze the tables they read
+baseline = sa.MetaData()
+
+players = sa.Table(
+    'players', baseline,
+    sa.Column('id', sa.Integer, primary_key=True, index=True),
+    sa.Column('name', sa.String, unique=True, index=True),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('updated_at', sa.DateTime),
+)
+
+player_stats = sa.Table(
+    'player_stats', baseline,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('player_id', sa.ForeignKey('players.id')),
+    sa.Column('match_type', sa.String, nullable=False),
+    sa.Column('season', sa.Integer),
+    *(sa.Column(field, sa.Integer, default=0) for field in (
+        'wins', 'losses', 'otl', 'streak', 'longest_streak', 'scored', 'conceded'
+    )),
+    sa.UniqueConstraint('player_id', 'match_type', 'season', name='unique_player_stats'),
+)
+
+matches = sa.Table(
+    'matches', baseline,
+    sa.Column('id', sa.Uuid, primary_key=True),
+    sa.Column('match_type', sa.String, nullable=False),
+    sa.Column('season', sa.Integer),
+    sa.Column('blue_score', sa.Integer, nullable=True),
+    sa.Column('red_score', sa.Integer, nullable=True),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('updated_at', sa.DateTime),
+)
+
+match_players = sa.Table(
+    'match_players', baseline,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('match_id', sa.ForeignKey('matches.id')),
+    sa.Column('player_id', sa.ForeignKey('players.id')),
+    sa.Column('color', sa.String, nullable=False),
+)
+
+
+async def test_models_create_on_sqlite(schema):
+    # The models use only portable column types, so every table is created
+    async with engine.connect() as conn:
+        tables = await conn.run_sync(lambda sync_conn: set(inspect(sync_conn).get_table_names()))
+
+    assert set(Base.metadata.tables) <= tables
+
+
+def test_single_alembic_head():
+    assert len(alembic_heads()) == 1
+
+
+def seed_history(conn):
+    # alice and Bob win, then lose in overtime; ties on points and names
+    # that differ in case check the backfilled ranking
+    season = 2025
+    names = ["alice", "Bob", "carol", "dave"]
+    ids = dict(zip(names, conn.execute(
+        players.insert().returning(players.c.id, sort_by_parameter_order=True),
+        [{"name": name} for name in names]
+    ).scalars()))
+
+    first, second, draft = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    conn.execute(matches.insert(), [
+        {"id": first, "match_type": "indoor", "season": season, "blue_score": 25, "red_score": 20,
+         "created_at": datetime(2025, 3, 1)},
+        {"id": second, "match_type": "indoor", "season": season, "blue_score": 24, "red_score": 26,
+         "created_at": datetime(2025, 3, 2)},
+        {"id": draft, "match_type": "indoor", "season": season, "blue_score": None, "red_score": None,
+         "created_at": datetime(2025, 3, 3)},
+    ])
+    conn.execute(match_players.insert(), [
+        {"match_id": match_id, "player_id": ids[name], "color": color}
+        for match_id in (first, second, draft)
+        for name, color in (("alice", "blue"), ("Bob", "blue"), ("carol", "red"), ("dave", "red"))
+    ])
+    conn.execute(player_stats.insert(), [
+        {"player_id": ids[name], "match_type": "indoor", "season": season, "wins": 1, "losses": losses,
+         "otl": otl, "streak": streak, "longest_streak": 1, "scored": scored, "conceded": conceded}
+        for name, losses, otl, streak, scored, conceded in (
+            ("alice", 0, 1, 0, 49, 46), ("Bob", 0, 1, 0, 49, 46),
+            ("carol", 1, 0, 1, 46, 49), ("dave", 1, 0, 1, 46, 49),
+        )
+    ])
+    return first, second, draft
+
+
+@pytest.mark.parametrize("start", ["baseline", "create_all"])
+def test_upgrade_head_fills_new_tables(tmp_path, start):
+    sync_engine = sa.create_engine(f"sqlite:///{tmp_path / 'upgrade.db'}")
+    with sync_engine.begin() as conn:
+        # Either the schema from before any migration, or everything the
+        # current models create, which the migrations must tolerate
+        (baseline if start == "baseline" else Base.metadata).create_all(conn)
+        first, second, draft = seed_history(conn)
+
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND,
+        env={**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'upgrade.db'}"},
+        check=True,
+        capture_output=True,
+    )
+
+    with sync_engine.connect() as conn:
+        assert tuple(conn.execute(sa.text("SELECT version_num FROM alembic_version")).scalars()) == alembic_heads()
+        assert set(Base.metadata.tables) - {"users"} <= set(inspect(conn).get_table_names())
+
+        leaderboard = conn.execute(sa.text(
+            "SELECT position, name, points FROM leaderboard ORDER BY position"
+        )).all()
+        assert [tuple(row) for row in leaderboard] == [(1, "Bob", 3), (2, "alice", 3), (3, "carol", 2), (4, "dave", 2)]
+
+        snapshots = {
+            (uuid.UUID(match_id), name): (efficiency, rating)
+            for match_id, name, efficiency, rating in conn.execute(sa.text(
+                "SELECT match_id, name, efficiency, rating FROM match_players"
+                " JOIN players ON players.id = match_players.player_id"
+            ))
+        }
+        assert snapshots[(first, "alice")] == (0, INITIAL_RATING)
+        assert snapshots[(second, "alice")][0] == pytest.approx(25 / 20)
+        assert snapshots[(second, "carol")][1] < INITIAL_RATING < snapshots[(second, "alice")][1]
+        # Drafts from before ratings keep efficiency based odds
+        assert snapshots[(draft, "alice")][1] is None
+
+        ratings = dict(conn.execute(sa.text(
+            "SELECT name, matches FROM player_ratings JOIN players ON players.id = player_ratings.player_id"
+        )).all())
+        assert ratings == {"alice": 2, "Bob": 2, "carol": 2, "dave": 2}
+
+    sync_engine.dispose()
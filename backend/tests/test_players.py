@@ -0,0 +1,67 @@
+async def test_create_player(client, auth_headers):
+    response = await client.post("/players/create", json={"name": "alice"}, headers=auth_headers)
+    assert response.status_code == 200
+    player = response.json()
+    assert player["name"] == "alice"
+    # An empty row per match type for the current season
+    assert sorted(stats["match_type"] for stats in player["stats"]) == ["beach", "indoor"]
+    assert all(stats["played"] == 0 for stats in player["stats"])
+
+
+async def test_create_player_requires_auth(client):
+    response = await client.post("/players/create", json={"name": "alice"})
+    assert response.status_code == 401
+
+
+async def test_create_duplicate_player(client, auth_headers):
+    await client.post("/players/create", json={"name": "alice"}, headers=auth_headers)
+    response = await client.post("/players/create", json={"name": "alice"}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+async def test_get_player(client, players):
+    response = await client.get(f"/players/{players[0]}")
+    assert response.status_code == 200
+    assert response.json()["name"] == players[0]
+
+    response = await client.get("/players/nobody")
+    assert response.status_code == 404
+
+
+async def test_list_players_etag(client, players, auth_headers):
+    response = await client.get("/players/")
+    assert response.status_code == 200
+    assert [player["name"] for player in response.json()] == sorted(players)
+    etag = response.headers["etag"]
+
+    response = await client.get("/players/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.post("/players/create", json={"name": "newcomer"}, headers=auth_headers)
+    response = await client.get("/players/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+async def test_player_matches(client, players, create_match, submit_results):
+    for _ in range(3):
+        match = await create_match(players[:2], players[2:4])
+        await submit_results(match["id"], 25, 20)
+
+    response = await client.get(f"/players/{players[0]}/matches", params={"limit": 2})
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page["items"]) == 2
+    assert page["next_cursor"]
+
+    response = await client.get(
+        f"/players/{players[0]}/matches", params={"limit": 2, "cursor": page["next_cursor"]}
+    )
+    assert len(response.json()["items"]) == 1
+    assert response.json()["next_cursor"] is None
+
+    response = await client.get(f"/players/{players[7]}/matches")
+    assert response.json()["items"] == []
+
+    response = await client.get("/players/nobody/matches")
+    assert response.status_code == 404
@@ -0,0 +1,52 @@
+"""
+Upper bounds on the SQL statements of the main endpoints, so an N+1 query
+or a lost batch shows up as a failing test with the offending statements.
+"""
+from app.core.query_count import assert_max_statements
+
+
+async def test_create_match_statements(client, players, auth_headers):
+    with assert_max_statements(4):
+        response = await client.post("/matches/create", headers=auth_headers, json={
+            "match_type": "indoor", "blue_team": players[:4], "red_team": players[4:]
+        })
+    assert response.status_code == 200
+
+
+async def test_submit_results_statements(client, players, create_match, auth_headers):
+    match = await create_match(players[:4], players[4:])
+    with assert_max_statements(15):
+        response = await client.put(
+            f"/matches/{match['id']}/results", headers=auth_headers, json={"blue_score": 25, "red_score": 20}
+        )
+    assert response.status_code == 200
+
+
+async def test_delete_match_statements(client, players, create_match):
+    match = await create_match(players[:4], players[4:])
+    with assert_max_statements(3):
+        response = await client.delete(f"/matches/{match['id']}")
+    assert response.status_code == 200
+
+
+async def test_reads_do_not_grow_with_rows(client, players, create_match, submit_results):
+    for _ in range(5):
+        match = await create_match(players[:4], players[4:])
+        await submit_results(match["id"], 25, 20)
+
+    with assert_max_statements(4):
+        assert (await client.get("/matches/")).status_code == 200
+    with assert_max_statements(4):
+        assert (await client.get("/matches/", params={"limit": 3})).status_code == 200
+    # The data version the cache entry is keyed on, then the match
+    with assert_max_statements(4):
+        assert (await client.get(f"/matches/{match['id']}")).status_code == 200
+    with assert_max_statements(3):
+        assert (await client.get("/players/")).status_code == 200
+    with assert_max_statements(2):
+        assert (await client.get(f"/players/{players[0]}")).status_code == 200
+    with assert_max_statements(1):
+        assert (await client.get("/leaderboard/")).status_code == 200
+    with assert_max_statements(1):
+        response = await client.post("/matches/balance", json={"match_type": "indoor", "players": players})
+        assert response.status_code == 200
@@ -0,0 +1,123 @@
+import json
+import random
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.rating_replay import rebuild_ratings, replay
+from app.utils.ratings import INITIAL_RATING, rating_changes
+
+
+def test_replay_matches_incremental_updates():
+    # The same history rated match by match and replayed in waves
+    rng = random.Random(0)
+    players, history = 20, []
+    for _ in range(500):
+        size = rng.choice([1, 2, 6])
+        roster = rng.sample(range(players), 2 * size)
+        history.append((roster[:size], roster[size:], rng.random() < 0.5))
+
+    ratings, played = [INITIAL_RATING] * players, [0] * players
+    for blue, red, blue_won in history:
+        blue_deltas, red_deltas = rating_changes(
+            [(ratings[p], played[p]) for p in blue],
+            [(ratings[p], played[p]) for p in red],
+            blue_won
+        )
+        for p, delta in zip(blue + red, blue_deltas + red_deltas):
+            ratings[p] += delta
+            played[p] += 1
+
+    match_index, player_index, is_blue = [], [], []
+    for number, (blue, red, _) in enumerate(history):
+        for p in blue + red:
+            match_index.append(number)
+            player_index.append(p)
+            is_blue.append(p in blue)
+
+    report = replay(
+        np.array(match_index),
+        np.array(player_index),
+        np.array(is_blue),
+        np.array([blue_won for _, _, blue_won in history]),
+        players
+    )
+
+    assert report.ratings == pytest.approx(ratings)
+    assert report.matches.tolist() == played
+    assert report.rated_matches == len(history)
+
+
+async def test_submit_updates_ratings(client, players, create_match, submit_results):
+    match = await create_match(players[:2], players[2:4])
+    assert match["blue_odds"] == 0.5
+    await submit_results(match["id"], 25, 20)
+
+    ratings = (await client.get("/ratings/", params={"match_type": "indoor"})).json()
+    assert ratings["total"] == 4
+    by_name = {entry["name"]: entry for entry in ratings["items"]}
+    assert by_name[players[0]]["rating"] > INITIAL_RATING > by_name[players[2]]["rating"]
+    assert [entry["position"] for entry in ratings["items"]] == [1, 2, 3, 4]
+
+    # The winners are favourites in the rematch, from their rating snapshots
+    rematch = await create_match(players[:2], players[2:4])
+    assert rematch["blue_odds"] > 0.5
+    assert rematch["blue_team"][0]["rating"] == by_name[players[0]]["rating"]
+
+
+async def test_rebuild_agrees_with_submissions(client, connection, players, create_match, submit_results):
+    for blue, red, scores in (
+        (players[:3], players[3:6], (25, 20)),
+        (players[:2], players[6:], (18, 25)),
+        (players[2:5], players[5:], (26, 24)),
+    ):
+        match = await create_match(blue, red)
+        await submit_results(match["id"], *scores)
+
+    submitted = (await client.get("/ratings/")).json()
+
+    async with AsyncSession(bind=connection, join_transaction_mode="create_savepoint") as session:
+        await rebuild_ratings(session)
+        await session.commit()
+
+    replayed = (await client.get("/ratings/")).json()
+    assert [entry["name"] for entry in replayed["items"]] == [entry["name"] for entry in submitted["items"]]
+    assert [entry["rating"] for entry in replayed["items"]] == pytest.approx(
+        [entry["rating"] for entry in submitted["items"]]
+    )
+
+
+async def test_rebuild_replays_in_played_order(client, players, auth_headers):
+    # Three matches between the same teams, listed out of played order
+    blue, red = players[:2], players[2:4]
+    played = [
+        ("2024-03-03T10:00:00", (25, 20)),
+        ("2024-03-01T10:00:00", (18, 25)),
+        ("2024-03-02T10:00:00", (25, 23)),
+    ]
+    lines = [
+        {"match_type": "indoor", "blue_team": blue, "red_team": red,
+         "blue_score": blue_score, "red_score": red_score, "played_at": played_at}
+        for played_at, (blue_score, red_score) in played
+    ]
+    response = await client.post(
+        "/matches/import",
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+        content="\n".join(json.dumps(line) for line in lines),
+    )
+    assert response.json()["imported"] == 3
+
+    ratings, counts = {name: INITIAL_RATING for name in blue + red}, {name: 0 for name in blue + red}
+    for _, (blue_score, red_score) in sorted(played):
+        blue_deltas, red_deltas = rating_changes(
+            [(ratings[name], counts[name]) for name in blue],
+            [(ratings[name], counts[name]) for name in red],
+            blue_score > red_score
+        )
+        for name, delta in zip(blue + red, blue_deltas + red_deltas):
+            ratings[name] += delta
+            counts[name] += 1
+
+    replayed = (await client.get("/ratings/", params={"match_type": "indoor"})).json()
+    assert {entry["name"]: entry["rating"] for entry in replayed["items"]} == pytest.approx(ratings)
@@ -0,0 +1,49 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import PlayerStats
+from app.utils.replay import STAT_FIELDS, list_partitions, recompute_partitions, replay_stats
+
+
+async def read_stats(session: AsyncSession):
+    response = await session.execute(select(PlayerStats))
+    return {
+        (stats.player_id, stats.match_type, stats.season): {field: getattr(stats, field) for field in STAT_FIELDS}
+        for stats in response.scalars()
+    }
+
+
+async def test_replay_matches_incremental_stats(client, connection, players, create_match, submit_results):
+    # Wins, regulation and overtime losses, streaks that break and resume
+    for blue, red, scores, match_type in (
+        (players[:2], players[2:4], (25, 20), "indoor"),
+        (players[:2], players[4:6], (25, 23), "indoor"),
+        (players[2:4], players[:2], (26, 24), "indoor"),
+        (players[:3], players[5:], (25, 18), "indoor"),
+        (players[4:6], players[6:], (21, 19), "beach"),
+        (players[6:], players[4:6], (22, 20), "beach"),
+        (players[6:], players[:2], (21, 10), "beach"),
+    ):
+        match = await create_match(blue, red, match_type=match_type)
+        await submit_results(match["id"], *scores)
+    # Drafts do not count
+    await create_match(players[:2], players[2:4])
+
+    async with AsyncSession(bind=connection, join_transaction_mode="create_savepoint") as session:
+        incremental = await read_stats(session)
+        partitions = await list_partitions(session)
+
+        conn = await session.connection()
+        for match_type, season in partitions:
+            for row in await replay_stats(conn, match_type, season):
+                key = (row["player_id"], match_type, season)
+                assert {field: row[field] for field in STAT_FIELDS} == incremental[key]
+
+        await recompute_partitions(session, partitions)
+        await session.commit()
+
+        assert await read_stats(session) == incremental
+
+    # The history did exercise every rule
+    assert any(stats["otl"] for stats in incremental.values())
+    assert max(stats["longest_streak"] for stats in incremental.values()) >= 2
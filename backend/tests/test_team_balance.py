@@ -0,0 +1,39 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from app.utils.team_balance import balance_teams, best_splits
+
+
+@pytest.mark.parametrize("count", range(2, 13))
+def test_best_splits_match_brute_force(count):
+    rng = random.Random(count)
+    values = [rng.uniform(0, 2) for _ in range(count)]
+    total = sum(values)
+
+    gaps = sorted(
+        abs(total - 2 * sum(values[i] for i in blue))
+        for blue in combinations(range(count), count // 2)
+        # Even pools count each split and its mirror once
+        if count % 2 or 0 in blue
+    )
+    splits = best_splits(values, top_k=5)
+
+    assert [split.gap for split in splits] == pytest.approx(gaps[:5])
+    for split in splits:
+        assert sorted(split.blue + split.red) == list(range(count))
+        assert len(split.blue) == count // 2
+
+
+def test_balance_teams_seeded():
+    values = [1.0, 1.0, 2.0, 2.0, 3.0, 3.0, 4.0, 4.0]
+    assert balance_teams(values).gap == 0
+    assert balance_teams(values, top_k=4, seed=7) == balance_teams(values, top_k=4, seed=7)
+
+
+def test_pool_limits():
+    with pytest.raises(ValueError):
+        best_splits([1.0])
+    with pytest.raises(ValueError):
+        best_splits([1.0] * 33)
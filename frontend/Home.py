@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from utils import api
-from utils.misc_functions import calculate_mmr, get_rank
+from utils.misc_functions import get_rank
 
 
 st.set_page_config(
@@ -26,49 +26,45 @@ Use the sidebar to navigate:
 st.markdown("---")
 st.header("🏆 Leaderboard")
 
+PAGE_SIZE = 50
+
 try:
-    players = api.get_players()
-    
-    if not players:
-        st.info("No players yet!")
+    # Filter options
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        match_type = st.selectbox("Match Type", ["indoor", "beach"])
+    with col2:
+        current_year = datetime.utcnow().year
+        season = st.number_input("Season", min_value=2024, max_value=current_year, value=current_year)
+    with col3:
+        page = st.number_input("Page", min_value=1, value=1)
+
+    leaderboard = api.get_leaderboard(
+        match_type, season, limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE
+    )
+
+    if not leaderboard['items']:
+        st.info(f"No stats for {match_type} in season {season}")
     else:
-        # Filter options
-        col1, col2 = st.columns(2)
-        with col1:
-            match_type = st.selectbox("Match Type", ["indoor", "beach"])
-        with col2:
-            current_year = datetime.utcnow().year
-            season = st.number_input("Season", min_value=2024, max_value=current_year, value=current_year)
-        
         # Build dataframe
         leaderboard_data = []
-        for player in players:
-            for stat in player.get('stats', []):
-                if stat['match_type'] == match_type and stat['season'] == season:
-                    leaderboard_data.append({
-                        'Player': player['name'],
-                        'Played': stat['played'],
-                        'Wins': stat['wins'],
-                        'Losses': stat['losses'],
-                        'OTL': stat['otl'],
-                        'Points': stat['points'],
-                        'Win Rate': f"{stat['winrate']:.1%}",
-                        "Avg Points": stat['avg_points'],
-                        "Efficiency": stat['efficiency']
-                    })
-        
-        if not leaderboard_data:
-            st.info(f"No stats for {match_type} in season {season}")
-        else:
-            df = pd.DataFrame(leaderboard_data)
-            df['MMR'] = df.apply(lambda row: calculate_mmr(row['Avg Points'], row['Efficiency']), axis=1)
-            df['Rank'] = df.apply(lambda row: get_rank(row['MMR'], row['Played']), axis=1)
-            df = df.sort_values('Points', ascending=False).reset_index(drop=True)
-            df.index += 1  # Start rank at 1
-            
-            st.dataframe(df, use_container_width=True, 
-                         column_config={"Avg Points": None, "Efficiency" : None, "MMR": None}
-            )
+        for entry in leaderboard['items']:
+            leaderboard_data.append({
+                'Player': entry['name'],
+                'Played': entry['played'],
+                'Wins': entry['wins'],
+                'Losses': entry['losses'],
+                'OTL': entry['otl'],
+                'Points': entry['points'],
+                'Win Rate': f"{entry['winrate']:.1%}",
+                'Rank': get_rank(entry['mmr'], entry['played'])
+            })
+
+        # Positions are computed server side
+        df = pd.DataFrame(leaderboard_data, index=[entry['position'] for entry in leaderboard['items']])
+
+        st.dataframe(df, use_container_width=True)
+        st.caption(f"{leaderboard['total']} players")
 
 except Exception as e:
     st.error("Failed to load leaderboard")
@@ -4,6 +4,9 @@ from utils import api
 from utils.misc_functions import calculate_mmr, get_rank
 
 
+# Matches per page of a player's history
+HISTORY_PAGE_SIZE = 20
+
 st.set_page_config(page_title="Players", page_icon="👥", layout="wide")
 
 st.title("👥 Players")
@@ -158,6 +161,49 @@ with tab1:
             else:
                 st.markdown(beach_stats)
 
+        # Match history of the season, refetched page by page on every rerun
+        # so it is never stale, "Load more" adds a page
+        st.subheader("Match History")
+        pages_key = f"history_pages_{option}_{season}"
+        pages = st.session_state.setdefault(pages_key, 1)
+
+        history, cursor = [], None
+        try:
+            for _ in range(pages):
+                page = api.get_player_matches(option, season=season, limit=HISTORY_PAGE_SIZE, cursor=cursor)
+                history += page["items"]
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+
+            if history:
+                st.dataframe(
+                    [
+                        {
+                            "Played": match["created_at"][:10],
+                            "Type": match["match_type"].capitalize(),
+                            "Team": "🔵 Blue" if match["color"] == "blue" else "🔴 Red",
+                            "Score": (
+                                f"{match['blue_score']}-{match['red_score']}"
+                                if match["blue_score"] is not None else "-"
+                            ),
+                            "Result": (match["result"] or "draft").upper(),
+                        }
+                        for match in history
+                    ],
+                    hide_index=True,
+                    use_container_width=True
+                )
+            else:
+                st.info("No matches this season yet.")
+        except Exception as e:
+            cursor = None
+            st.error("Failed to load match history")
+
+        if cursor is not None and st.button("Load more matches"):
+            st.session_state[pages_key] = pages + 1
+            st.rerun()
+
 
 with tab2:
     # Add new player
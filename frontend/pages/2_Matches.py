@@ -5,6 +5,13 @@ from utils.misc_functions import shuffle_players
 from datetime import date
 
 
+# Near-balanced splits a balanced draft picks from, so lineups vary
+BALANCED_TOP_K = 5
+
+# Completed matches shown at first and added by each "Load more"
+COMPLETED_PAGE_SIZE = 50
+
+
 st.set_page_config(page_title="Matches", page_icon="🏐", layout="wide")
 
 st.title("🏐 Matches")
@@ -31,7 +38,7 @@ with tab1:
                 blue_team = st.multiselect("Select Blue Team", player_names, key="blue")
             
             with col2:
-                draft_type = st.pills("Draft Type", ["random", "manual"], default="random")
+                draft_type = st.pills("Draft Type", ["random", "balanced", "manual"], default="random")
 
                 # Filter out players already on blue team
                 available_for_red = [p for p in player_names if p not in blue_team]
@@ -46,6 +53,14 @@ with tab1:
                     if draft_type == "random":
                         blue_team, red_team = shuffle_players(blue_team + red_team)
 
+                    # If draft type is balanced, pick one of the most even splits
+                    elif draft_type == "balanced":
+                        split = api.balance_teams(
+                            blue_team + red_team, match_type, top_k=BALANCED_TOP_K, metric="rating"
+                        )
+                        blue_team = [p["name"] for p in split["blue_team"]]
+                        red_team = [p["name"] for p in split["red_team"]]
+
                     try:
                         match = api.create_match({
                             "match_type": match_type,
@@ -160,29 +175,47 @@ with tab3:
         start_date = date_range[0]
         end_date = date_range[0]
 
+    # Only the matches on screen are fetched, "Load more" shows another page
+    shown_key = f"completed_shown_{start_date}_{end_date}"
+    shown = st.session_state.setdefault(shown_key, COMPLETED_PAGE_SIZE)
+    has_more = False
+
     try:
-        completed = api.get_matches(status="completed", start_date=start_date, end_date=end_date)
-        if not completed:
-            st.info("No completed matches yet.")
-        else:
-            for match in completed:
-                winner_emoji = "🔵" if match['winner'] == "blue" else "🔴"
-                ot_badge = "⏱️ OT" if match['is_overtime'] else ""
+        # One extra match tells whether there is anything left to load
+        completed = list(api.iter_matches(
+            status="completed",
+            start_date=start_date,
+            end_date=end_date,
+            page_size=COMPLETED_PAGE_SIZE,
+            max_matches=shown + 1
+        ))
+        has_more = len(completed) > shown
+        match = None
+        for match in completed[:shown]:
+            winner_emoji = "🔵" if match['winner'] == "blue" else "🔴"
+            ot_badge = "⏱️ OT" if match['is_overtime'] else ""
+            
+            with st.expander(f"{winner_emoji} {match['blue_score']}-{match['red_score']} {ot_badge} - {match['match_type'].upper()}"):
+                col1, col2 = st.columns(2)
                 
-                with st.expander(f"{winner_emoji} {match['blue_score']}-{match['red_score']} {ot_badge} - {match['match_type'].upper()}"):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown(f"**🔵 Blue Team - {match['blue_score']}**")
-                        for player in match['blue_team']:
-                            st.text(f"- {player['name']}")
-                    
-                    with col2:
-                        st.markdown(f"**🔴 Red Team - {match['red_score']}**")
-                        for player in match['red_team']:
-                            st.text(f"- {player['name']}")
-                    
-                    st.caption(f"Played: {match['created_at']}")
+                with col1:
+                    st.markdown(f"**🔵 Blue Team - {match['blue_score']}**")
+                    for player in match['blue_team']:
+                        st.text(f"- {player['name']}")
+                
+                with col2:
+                    st.markdown(f"**🔴 Red Team - {match['red_score']}**")
+                    for player in match['red_team']:
+                        st.text(f"- {player['name']}")
+                
+                st.caption(f"Played: {match['created_at']}")
+
+        if match is None:
+            st.info("No completed matches yet.")
     
     except Exception as e:
         st.error("Failed to load completed matches")
+
+    if has_more and st.button("Load more matches"):
+        st.session_state[shown_key] = shown + COMPLETED_PAGE_SIZE
+        st.rerun()
@@ -1,11 +1,44 @@
 import streamlit as st
 import requests
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from typing import List, Dict, Iterator, Optional, Tuple
 from datetime import date
 
 
 API_BASE = st.secrets["API_BASE_URL"]
 
+# Request URLs whose last body is kept for revalidation, least recently used
+# ones are dropped first
+ETAG_CACHE_SIZE = 128
+
+# Last (ETag, body) per request URL, replayed when the API answers 304
+_etag_cache: "OrderedDict[str, Tuple[str, object]]" = OrderedDict()
+
+
+def get_with_etag(url: str, params: Optional[Dict] = None):
+    key = requests.Request("GET", url, params=params).prepare().url
+    cached = _etag_cache.get(key)
+    if cached:
+        _etag_cache.move_to_end(key)
+
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    response = requests.get(url, params=params, headers=headers)
+
+    if response.status_code == 304 and cached:
+        return cached[1]
+
+    response.raise_for_status()
+    body = response.json()
+
+    etag = response.headers.get("ETag")
+    if etag:
+        _etag_cache[key] = (etag, body)
+        _etag_cache.move_to_end(key)
+        while len(_etag_cache) > ETAG_CACHE_SIZE:
+            _etag_cache.popitem(last=False)
+
+    return body
+
 
 def login(email: str, password: str):
     response = requests.post(
@@ -33,8 +66,40 @@ def get_player(name: str) -> Dict:
     return response.json()
 
 
+def get_player_matches(
+    name: str,
+    match_type: Optional[str] = None,
+    season: Optional[int] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Dict:
+    response = requests.get(
+        f"{API_BASE}/players/{name}/matches",
+        params={
+            "match_type": match_type,
+            "season": season,
+            "limit": limit,
+            "cursor": cursor
+        }
+    )
+    response.raise_for_status()
+    return response.json()
+
+
 def get_players() -> List[Dict]:
-    response = requests.get(f"{API_BASE}/players")
+    return get_with_etag(f"{API_BASE}/players/")
+
+
+def get_leaderboard(match_type: str, season: int, limit: int = 50, offset: int = 0) -> Dict:
+    response = requests.get(
+        f"{API_BASE}/leaderboard/",
+        params={
+            "match_type": match_type,
+            "season": season,
+            "limit": limit,
+            "offset": offset
+        }
+    )
     response.raise_for_status()
     return response.json()
 
@@ -59,12 +124,21 @@ def create_match(match_data: Dict) -> Dict:
     return response.json()
 
 
+def balance_teams(players: List[str], match_type: str, top_k: int = 1, metric: str = "efficiency") -> Dict:
+    response = requests.post(
+        f"{API_BASE}/matches/balance",
+        json={"players": players, "match_type": match_type, "top_k": top_k, "metric": metric}
+    )
+    response.raise_for_status()
+    return response.json()
+
+
 def get_matches(
     status: str = "all",
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
 ) -> List[Dict]:
-    response = requests.get(
+    return get_with_etag(
         f"{API_BASE}/matches/",
         params={
             "status": status,
@@ -72,8 +146,50 @@ def get_matches(
             "end_date": str(end_date) if end_date else None
         }
     )
-    response.raise_for_status()
-    return response.json()
+
+
+def get_matches_page(
+    status: str = "all",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Dict:
+    return get_with_etag(
+        f"{API_BASE}/matches/",
+        params={
+            "status": status,
+            "start_date": str(start_date) if start_date else None,
+            "end_date": str(end_date) if end_date else None,
+            "limit": limit,
+            "cursor": cursor
+        }
+    )
+
+
+def iter_matches(
+    status: str = "all",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    page_size: int = 50,
+    max_matches: Optional[int] = None,
+) -> Iterator[Dict]:
+    """
+    Matches newest first, fetched a page at a time while the caller keeps
+    iterating. With max_matches no page past the last one needed is fetched.
+    """
+    cursor, remaining = None, max_matches
+    while remaining is None or remaining > 0:
+        limit = page_size if remaining is None else min(page_size, remaining)
+        page = get_matches_page(status, start_date, end_date, limit, cursor)
+
+        yield from page["items"]
+
+        if remaining is not None:
+            remaining -= len(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
 
 
 def get_match(match_id: str) -> Dict: